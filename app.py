@@ -1,19 +1,53 @@
 from fastapi import FastAPI, Request, Response
-from fastapi.responses import JSONResponse, HTMLResponse
-from jinja2 import Environment, FileSystemLoader
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
-import requests
+import http_client
+import metrics
 import re
 from html import unescape
 import os
-import json
 import logging
+import asyncio
+import contextvars
+import functools
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Importações dos seus módulos
-from netcine import catalog_search, search_link, search_term
-from gofilmes import search_gofilmes, resolve_stream as resolve_gofilmes_stream
+from local_store import LocalStore, COMPILED_PATH, SCRAPED_PREFIXES, INGEST_MAX_AGE, INGEST_STATE
+from stream_cache import cached_resolver, stream_ttl, link_ttl, is_signed
+from singleflight import AsyncSingleFlight
+from prefetch import Prefetcher, PREFETCH_MAX_PENDING
+from response_cache import StaleWhileRevalidate
+from health import HealthTracker
+from probe import rank_streams, PROBE_ENABLED
+from encoding import FastJSONResponse, respond
+from http_cache import (etag, STATIC_MAX_AGE, STATIC_SWR, CATALOG_MAX_AGE, CATALOG_SWR,
+                        STREAM_LOCAL_MAX_AGE, STREAM_LOCAL_SWR, STREAM_MAX_AGE, STREAM_SWR, STREAM_EMPTY_MAX_AGE)
+
+# Subida rápida (serverless, ex.: Vercel): scrapers, índice local e template só são carregados
+# na primeira requisição que precisa deles. Fora dele tudo é carregado na subida (warm_up)
+FAST_START = os.environ.get("FAST_START", "1" if os.environ.get("VERCEL") else "0") not in ("0", "false", "False", "")
+
+def lazy(module, name):
+    """
+    Função que só importa 'module' na primeira chamada; os scrapers trazem requests, bs4 e lxml.
+    """
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+catalog_search = lazy('netcine', 'catalog_search')
+search_link = lazy('netcine', 'search_link')
+search_term = lazy('netcine', 'search_term')
+next_episode = lazy('netcine', 'next_episode')
+show_episodes = lazy('netcine', 'show_episodes')
+gofilmes_streams = lazy('gofilmes', 'gofilmes_streams')
+series_episodes = lazy('gofilmes', 'series_episodes')
 
 VERSION = "0.0.1"
 MANIFEST = {
@@ -25,14 +59,49 @@ MANIFEST = {
         {"type": "series", "id": "fenixsky", "name": "FENIXSKY", "extraSupported": ["search"]}
     ], "idPrefixes": ["fenixsky", "tt"]
 }
-templates = Environment(loader=FileSystemLoader("templates"))
+# Orçamento total de latência do /stream e timeout de cada fonte (segundos)
+STREAM_BUDGET = float(os.environ.get("STREAM_BUDGET", "8"))
+SOURCE_TIMEOUT = float(os.environ.get("SOURCE_TIMEOUT", "6"))
+SOURCE_WORKERS = int(os.environ.get("SOURCE_WORKERS", "16"))
+# Episódios resolvidos ao mesmo tempo por requisição no /stream de temporada
+SEASON_CONCURRENCY = int(os.environ.get("SEASON_CONCURRENCY", "4"))
+SEASON_MAX_EPISODES = int(os.environ.get("SEASON_MAX_EPISODES", "200"))
+source_executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS, thread_name_prefix="source")
+prefetch_executor = ThreadPoolExecutor(max_workers=max(PREFETCH_MAX_PENDING, 1) * 3, thread_name_prefix="prefetch")
+local_store = LocalStore("Json", reload_interval=float(os.environ.get("LOCAL_STORE_RELOAD", "30")), compiled=COMPILED_PATH,
+                         lazy=FAST_START, state_path=INGEST_STATE)
+request_flight = AsyncSingleFlight()
+source_health = HealthTracker()
+# Corpos fixos: gerados uma vez, com o ETag já calculado
+MANIFEST_BODY = FastJSONResponse(content=MANIFEST).body
+MANIFEST_ETAG = etag(MANIFEST_BODY)
+META_BODY = FastJSONResponse(content={"meta": {}}).body
+META_ETAG = etag(META_BODY)
 limiter = Limiter(key_func=get_remote_address)
-rate_limit = '5/second'
+rate_limit = os.environ.get("RATE_LIMIT", '5/second')
 app = FastAPI()
 
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request, exc):
-    return JSONResponse(content={"error": "Too many requests"}, status_code=429)
+    return FastJSONResponse(content={"error": "Too many requests"}, status_code=429)
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    timings = metrics.start_request()
+    # Cada requisição é um fluxo próprio nas filas por host do http_client
+    http_client.set_flow(object())
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    route = request.scope.get('route')
+    endpoint = getattr(route, 'path', None) or getattr(request.scope.get('endpoint'), '__name__', 'other')
+    metrics.observe('fenixsky_request_seconds', elapsed, endpoint=endpoint)
+    response.headers["Server-Timing"] = metrics.server_timing(timings, elapsed)
+    return response
+
+def in_executor(executor, func, *args):
+    # A thread recebe uma cópia do contexto para registrar seus tempos no Server-Timing da requisição
+    return asyncio.get_running_loop().run_in_executor(executor, contextvars.copy_context().run, func, *args)
 
 def add_cors(response: Response):
     response.headers["Access-Control-Allow-Origin"] = "*"
@@ -41,18 +110,33 @@ def add_cors(response: Response):
     response.headers["Access-Control-Allow-Credentials"] = "true"
     return response
 
+_robotlink_re = re.compile(r'<div id="robotlink" style="display:none;">(.*?)</div>')
+_botlink_re = re.compile(r'<span id="botlink" style="display:none;">(.*?)</span>')
+
+@functools.lru_cache(maxsize=None)
+def index_page():
+    """
+    index.html renderizado uma vez só, com o ETag; o jinja2 só é importado aqui.
+    """
+    from jinja2 import Environment, FileSystemLoader
+    templates = Environment(loader=FileSystemLoader("templates"))
+    body = templates.get_template("index.html").render(name=MANIFEST['name'], types=MANIFEST['types'], logo=MANIFEST['logo'], description=MANIFEST['description'], version=MANIFEST['version']).encode()
+    return body, etag(body)
+
+@cached_resolver('streamtape')
+@metrics.timed('streamtape')
 def resolve_streamtape_link(player_url: str):
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        page_content = requests.get(player_url, headers=headers).text
+        page_content = http_client.get(player_url, headers=headers).text
         video_url_part = None
 
-        match = re.search(r'<div id="robotlink" style="display:none;">(.*?)</div>', page_content)
+        match = _robotlink_re.search(page_content)
         if match:
             video_url_part = match.group(1)
 
         if not video_url_part:
-            match = re.search(r'<span id="botlink" style="display:none;">(.*?)</span>', page_content)
+            match = _botlink_re.search(page_content)
             if match:
                 video_url_part = match.group(1)
 
@@ -60,96 +144,336 @@ def resolve_streamtape_link(player_url: str):
 
         direct_video_url = "https:" + video_url_part
         return {"name": "Streamtape Robusto", "url": direct_video_url, "behaviorHints": {"proxyHeaders": {"request": {"User-Agent": "Mozilla/5.0", "Referer": player_url}}}}
-    except Exception:
+    except Exception as e:
+        metrics.error('streamtape', e)
         return None
 
 @app.get("/", response_class=HTMLResponse)
 @limiter.limit(rate_limit)
 async def home(request: Request):
-    template = templates.get_template("index.html")
-    return add_cors(HTMLResponse(template.render(name=MANIFEST['name'], types=MANIFEST['types'], logo=MANIFEST['logo'], description=MANIFEST['description'], version=MANIFEST['version'])))
+    body, tag = index_page()
+    return add_cors(respond(request, HTMLResponse(body), STATIC_MAX_AGE, STATIC_SWR, tag, cache=True))
 
 @app.get("/manifest.json")
 @limiter.limit(rate_limit)
 async def manifest(request: Request):
-    return add_cors(JSONResponse(content=MANIFEST))
+    return add_cors(respond(request, Response(MANIFEST_BODY, media_type="application/json"), STATIC_MAX_AGE, STATIC_SWR, MANIFEST_ETAG, cache=True))
 
 @app.get("/catalog/{type}/skyflix/search={query}.json")
 @limiter.limit(rate_limit)
 async def search(type: str, query: str, request: Request):
-    catalog = catalog_search(query)
+    catalog = await request_flight.do(("catalog", query.strip().lower()), in_executor, source_executor, catalog_search, query)
     results = [item for item in catalog if item.get("type") == type] if catalog else []
-    return add_cors(JSONResponse(content={"metas": results}))
+    max_age, swr = (CATALOG_MAX_AGE, CATALOG_SWR) if results else (STREAM_EMPTY_MAX_AGE, 0)
+    return add_cors(respond(request, FastJSONResponse(content={"metas": results}), max_age, swr))
 
 @app.get("/meta/{type}/{id}.json")
 @limiter.limit(rate_limit)
 async def meta(type: str, id: str, request: Request):
-    return add_cors(JSONResponse(content={"meta": {}}))
+    return add_cors(respond(request, Response(META_BODY, media_type="application/json"), STATIC_MAX_AGE, STATIC_SWR, META_ETAG, cache=True))
+
+def local_streams(imdb_id, type, season=None, episode=None):
+    """
+    Busca os streams salvos na pasta 'Json/' (índice em memória).
+    """
+    return local_store.lookup(imdb_id, type, season, episode)
+
+def ingested(imdb_id, season, episode, streams):
+    """
+    True se o filme ou episódio foi pré-resolvido pelo ingest.py (streams com o nome dos
+    scrapers) há menos de INGEST_MAX_AGE, segundo o progresso do ingest: aí os scrapers não
+    precisam rodar. Links assinados expiram em minutos e nunca dispensam os scrapers.
+    """
+    if not any(str(stream.get('name', '')).startswith(SCRAPED_PREFIXES) for stream in streams):
+        return False
+    if any(is_signed(stream) for stream in streams):
+        return False
+    age = local_store.age(imdb_id, season, episode)
+    return age is not None and age < INGEST_MAX_AGE
+
+def call_source(func, *args):
+    # Devolve também quantas falhas de upstream a fonte engoliu, para separar 'não achou' de 'caiu'
+    failures = metrics.track_failures()
+    return func(*args) or [], len(failures)
+
+async def run_source(name, func, *args, executor=None):
+    """
+    Executa uma fonte bloqueante fora do event loop, limitada por SOURCE_TIMEOUT.
+    Devolve (streams, resultado); o tempo e o resultado de cada fonte vão para o Server-Timing,
+    o /metrics e o circuito da fonte.
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        streams, failures = await asyncio.wait_for(in_executor(executor or source_executor, call_source, func, *args), SOURCE_TIMEOUT)
+        outcome = 'ok' if streams else ('failed' if failures else 'empty')
+        return streams, outcome
+    except asyncio.TimeoutError:
+        outcome = 'timeout'
+        logging.warning(f"Fonte {name} excedeu {SOURCE_TIMEOUT}s")
+    except asyncio.CancelledError:
+        outcome = 'cancelled'
+        raise
+    except Exception as e:
+        logging.error(f"Erro na fonte {name}: {e}")
+    finally:
+        record_source(name, outcome, time.perf_counter() - start)
+    return [], outcome
+
+def record_source(name, outcome, elapsed):
+    metrics.record(name, elapsed)
+    metrics.inc('fenixsky_source_total', source=name, outcome=outcome)
+    source_health.record(name, outcome in ('ok', 'empty'), elapsed)
+
+async def run_local(imdb_id, type, season, episode):
+    """
+    Consulta o 'Json/' direto no event loop (índice em memória ou catálogo com mmap), sem
+    passar pelo pool das fontes; só a primeira consulta, que monta o índice, vai para uma thread.
+    Devolve (streams, resultado), como run_source.
+    """
+    if not local_store.loaded:
+        return await run_source("local", local_streams, imdb_id, type, season, episode)
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        streams = local_streams(imdb_id, type, season, episode) or []
+        outcome = 'ok' if streams else 'empty'
+        return streams, outcome
+    except Exception as e:
+        logging.error(f"Erro na fonte local: {e}")
+    finally:
+        record_source("local", outcome, time.perf_counter() - start)
+    return [], outcome
+
+async def gather_sources(sources, budget=None, executor=None):
+    """
+    Roda todas as fontes em paralelo. Devolve {nome: streams} do que terminou dentro do
+    orçamento, na ordem das fontes, e os nomes das que falharam ou não terminaram.
+    """
+    tasks = [asyncio.ensure_future(run_source(name, func, *args, executor=executor)) for name, func, args in sources]
+    done, pending = await asyncio.wait(tasks, timeout=STREAM_BUDGET if budget is None else budget)
+    for task in pending:
+        task.cancel()
+    results, failed = {}, []
+    for (name, _, _), task in zip(sources, tasks):
+        streams, outcome = task.result() if task in done else ([], 'cancelled')
+        results[name] = streams
+        if outcome not in ('ok', 'empty'):
+            failed.append(name)
+    return results, failed
+
+def parse_id(type, id):
+    """
+    (imdb_id, temporada, episódio) de um id do Stremio, ou None se for inválido.
+    """
+    if type not in ["movie", "series"]:
+        return None
+    imdb_id = id.split(':')[0]
+    season, episode = None, None
+
+    if type == 'series':
+        try:
+            parts = id.split(':')
+            season = int(parts[1])
+            episode = int(parts[2])
+        except (IndexError, ValueError):
+            return None
+    return imdb_id, season, episode
+
+async def fetch_streams(type, id, executor=None):
+    """
+    {'streams': [...], 'failed': fontes que falharam, não terminaram ou estão com o circuito
+    aberto, 'scraped': se algum stream veio dos scrapers}.
+    """
+    parsed = parse_id(type, id)
+    if not parsed:
+        return {"streams": [], "failed": [], "scraped": False}
+    imdb_id, season, episode = parsed
+
+    # Fontes: JSON Local -> Netcine -> GoFilmes, sempre nessa ordem na resposta; fontes com o
+    # circuito aberto ficam de fora. O 'Json/' é lido antes: se o item foi ingerido há pouco,
+    # os scrapers nem rodam; senão rodam em paralelo no que sobrou do STREAM_BUDGET
+    deadline = time.monotonic() + STREAM_BUDGET
+    local = ("local", local_streams, (imdb_id, type, season, episode))
+    scrapers = [
+        ("netcine", search_link, (id,)),
+        ("gofilmes", gofilmes_streams, (imdb_id, type, season, episode)),
+    ]
+    results, failed = {}, ['local']
+    if source_health.select([local]):
+        streams, outcome = await run_local(imdb_id, type, season, episode)
+        results['local'] = streams
+        failed = [] if outcome in ('ok', 'empty') else ['local']
+    if not ingested(imdb_id, season, episode, results.get('local', [])):
+        selected = source_health.select(scrapers)
+        budget = max(deadline - time.monotonic(), 0)
+        scraped, scraped_failed = await gather_sources(selected, budget, executor=executor)
+        results.update(scraped)
+        failed += [name for name, _, _ in scrapers if name not in scraped] + scraped_failed
+
+    # Um link pode vir de mais de uma fonte (ex.: 'Json/' ingerido e scraper): fica o primeiro
+    streams, urls = [], set()
+    for name, _, _ in [local] + scrapers:
+        for stream in results.get(name, []):
+            if stream.get('url') not in urls:
+                urls.add(stream.get('url'))
+                streams.append(stream)
+    # Links ingeridos também são dos scrapers: a política de cache é a deles (ver stream_cache_policy)
+    return {
+        "streams": streams,
+        "failed": failed,
+        "scraped": any(str(stream.get('name', '')).startswith(SCRAPED_PREFIXES) for stream in streams)
+                   or any(streams for name, streams in results.items() if name != 'local'),
+    }
+
+def next_episode_id(id):
+    try:
+        imdb_id, season, episode = id.split(':')[:3]
+        following = next_episode(imdb_id, int(season), int(episode))
+    except ValueError:
+        return None
+    return f"{imdb_id}:{following[0]}:{following[1]}" if following else None
+
+async def prefetch_streams(type, id):
+    # Usa um pool próprio e pequeno para não competir com as requisições dos clientes,
+    # e um fluxo só para as pré-buscas nas filas por host
+    http_client.set_flow('prefetch')
+    result = await request_flight.do(("stream", type, id), fetch_streams, type, id, prefetch_executor)
+    return result if result['streams'] else None
+
+def stream_cache_policy(result, streams, remaining=None):
+    """
+    (max-age, stale-while-revalidate, só local?) do /stream. Longo só se tudo veio do 'Json/' e
+    nenhuma fonte falhou; com links raspados, nunca mais que o TTL do link mais curto (ou o que
+    resta da lista em cache) e sem stale-while-revalidate se houver link assinado.
+    """
+    if not streams or result['failed']:
+        # Vazio ou incompleto: cache curto, para uma falha passageira não ficar presa na CDN
+        return STREAM_EMPTY_MAX_AGE, 0, False
+    if not result['scraped']:
+        return STREAM_LOCAL_MAX_AGE, STREAM_LOCAL_SWR, True
+    max_age = min([STREAM_MAX_AGE] + [stream_ttl(item) for item in streams])
+    if remaining is not None:
+        max_age = min(max_age, int(remaining))
+    return max_age, 0 if any(is_signed(item) for item in streams) else STREAM_SWR, False
+
+async def compute_streams(type, id, refresh=False):
+    # A atualização em segundo plano do cache de respostas não reaproveita a pré-busca,
+    # que pode ser tão velha quanto a lista que está sendo atualizada
+    result = None if refresh else await prefetcher.get(type, id)
+    if result is None:
+        # Requisições iguais em andamento neste worker esperam pela mesma busca
+        result = await request_flight.do(("stream", type, id), fetch_streams, type, id)
+    return result
+
+response_cache = StaleWhileRevalidate(compute_streams, link_ttl)
+metrics.gauge('fenixsky_stream_response_events', lambda: response_cache.stats, label='event')
+# Episódio que já está no cache de respostas não é pré-buscado de novo
+prefetcher = Prefetcher(prefetch_streams, next_episode_id, cached=response_cache.has)
+metrics.gauge('fenixsky_prefetch_events', lambda: prefetcher.stats, label='event')
+metrics.gauge('fenixsky_prefetch_hit_ratio', prefetcher.hit_rate)
+# 0 = fechado, 1 = meio-aberto, 2 = aberto
+metrics.gauge('fenixsky_source_circuit_state', source_health.states, label='source')
+metrics.gauge('fenixsky_source_error_rate', lambda: {name: round(h.error_rate, 4) for name, h in source_health.sources.items()}, label='source')
+metrics.gauge('fenixsky_source_latency_seconds', lambda: {name: round(h.latency or 0, 4) for name, h in source_health.sources.items()}, label='source')
+
+async def serve_streams(type, id):
+    """
+    (resultado de fetch_streams, streams a responder, segundos até o TTL rígido da lista).
+    """
+    # Lista em cache sai na hora; se já passou do TTL suave é atualizada em segundo plano
+    result, remaining = await response_cache.get(type, id)
+    scrape_ = result['streams']
+    if PROBE_ENABLED and scrape_:
+        # Tira os links fora do ar e põe os mais rápidos primeiro
+        scrape_ = await in_executor(source_executor, rank_streams, scrape_)
+    return result, scrape_, remaining
 
 @app.get("/stream/{type}/{id}.json")
 @limiter.limit(rate_limit)
 async def stream(type: str, id: str, request: Request):
-    scrape_ = []
+    result, scrape_, remaining = await serve_streams(type, id)
+    prefetcher.schedule(type, id)
+    max_age, swr, local = stream_cache_policy(result, scrape_, remaining)
+    # Respostas só do 'Json/' se repetem: o corpo comprimido fica guardado pelo ETag
+    return add_cors(respond(request, FastJSONResponse(content={"streams": scrape_}), max_age, swr, cache=local))
 
-    if type in ["movie", "series"]:
-        imdb_id = id.split(':')[0]
-        season, episode = None, None
+def season_length(imdb_id, season):
+    """
+    Número de episódios da temporada: o maior entre o menu do show no netcine, o painel de
+    temporadas do GoFilmes (as duas páginas ficam em cache) e os episódios seguidos do 'Json/'.
+    """
+    counts = []
+    try:
+        show = show_episodes(imdb_id)
+        counts.append(len(show['seasons'][season - 1]) if show and season <= len(show['seasons']) else 0)
+    except Exception as e:
+        metrics.error('netcine_show', e)
+    titles, _ = search_term(imdb_id)
+    seasons = series_episodes(titles) if titles else []
+    counts.append(len(seasons[season - 1]) if season <= len(seasons) else 0)
+    local = 0
+    while local_streams(imdb_id, 'series', season, local + 1):
+        local += 1
+    return max(counts + [local])
 
-        if type == 'series':
-            try:
-                parts = id.split(':')
-                season = int(parts[1])
-                episode = int(parts[2])
-            except (IndexError, ValueError):
-                return add_cors(JSONResponse(content={"streams": []}))
-
-        # --- Fonte: JSON Local ---
-        json_path = os.path.join("Json", f"{imdb_id}.json")
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    local_data = json.load(f)
-
-                if local_data.get('id') == imdb_id:
-                    if type == 'series' and season and episode:
-                        for item in local_data.get('streams', []):
-                            if item.get('temporada') == season and item.get('episodio') == episode:
-                                scrape_.extend(item.get('streams', []))
-                                break
-                    elif type == 'movie':
-                        scrape_.extend(local_data.get('streams', []))
+async def season_lines(imdb_id, season, first, last):
+    """
+    Uma linha JSON por episódio, na ordem em que cada um fica pronto. Os episódios passam pelo
+    mesmo cache e deduplicação do /stream, então uma chamada individual depois já sai do cache.
+    """
+    if last is None:
+        last = min(await in_executor(source_executor, season_length, imdb_id, season), first + SEASON_MAX_EPISODES - 1)
+    semaphore = asyncio.Semaphore(SEASON_CONCURRENCY)
 
+    async def episode_streams(episode):
+        id = f"{imdb_id}:{season}:{episode}"
+        async with semaphore:
+            try:
+                _, streams, _ = await serve_streams('series', id)
             except Exception as e:
-                logging.error(f"Erro ao ler JSON de {json_path}: {e}")
+                logging.error(f"Erro no episódio {id}: {e}")
+                streams = []
+        return {"id": id, "season": season, "episode": episode, "streams": streams}
 
-        titles, _ = search_term(imdb_id)
-        if not titles: return add_cors(JSONResponse(content={"streams": []}))
+    tasks = [asyncio.ensure_future(episode_streams(episode)) for episode in range(first, last + 1)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield FastJSONResponse(content=await task).body + b"\n"
+    finally:
+        # Cliente desconectou: os episódios que faltam não são mais resolvidos
+        for task in tasks:
+            task.cancel()
 
-        # --- Fonte: Netcine ---
-        try:
-            netcine_streams = search_link(id)
-            if netcine_streams: scrape_.extend(netcine_streams)
-        except Exception:
-            pass
+@app.get("/stream/series/{imdb_id}/season/{season}.ndjson")
+@limiter.limit(rate_limit)
+async def season_stream(imdb_id: str, season: int, request: Request, first: int = 1, last: int = None):
+    """
+    Streams de vários episódios de uma temporada (todos, ou de 'first' a 'last') numa chamada só,
+    em NDJSON: {"id", "season", "episode", "streams"} por linha, conforme cada episódio termina.
+    """
+    if season < 1 or first < 1 or (last is not None and not first <= last < first + SEASON_MAX_EPISODES):
+        return add_cors(FastJSONResponse(content={"error": "Temporada ou episódios inválidos"}, status_code=400))
+    return add_cors(StreamingResponse(season_lines(imdb_id, season, first, last), media_type="application/x-ndjson",
+                                      headers={"Cache-Control": "no-store"}))
 
-        # --- Fonte: GoFilmes ---
-        try:
-            gofilmes_player_options = search_gofilmes(titles, type, season, episode)
-            for option in gofilmes_player_options:
-                stream_url, stream_headers = resolve_gofilmes_stream(option['url'])
-                if stream_url:
-                    stream_name = option['name']
-                    if 'mediafire.com' in stream_url: stream_name += " (Só no Navegador)"
-                    stream_obj = {"name": stream_name, "url": stream_url}
-                    if stream_headers:
-                        stream_obj["behaviorHints"] = {"proxyHeaders": {"request": stream_headers}}
-                    scrape_.append(stream_obj)
-        except Exception:
-            pass
-        
-    return add_cors(JSONResponse(content={"streams": scrape_}))
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.options("/{path:path}")
 @limiter.limit(rate_limit)
 async def options_handler(path: str, request: Request):
     return add_cors(Response(status_code=204))
+
+def warm_up():
+    """
+    Carrega na subida o que o FAST_START deixaria para a primeira requisição.
+    """
+    for module in ('requests', 'netcine', 'gofilmes'):
+        importlib.import_module(module)
+    local_store.load()
+    index_page()
+
+if not FAST_START:
+    warm_up()
@@ -0,0 +1,79 @@
+"""
+Taxa de acerto e latência dos backends de cache (cache.make_cache) com vários workers,
+como no 'uvicorn --workers=4' do Dockerfile: no backend em memória cada worker esquenta
+o seu próprio cache; nos backends SQLite e Redis o cache é compartilhado.
+
+O Redis é simulado por benchmarks/resp_server.py.
+
+Uso: python benchmarks/bench_cache.py [workers] [requisicoes_por_worker]
+"""
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+KEYS = 2000
+
+
+def worker(cache_url, seed, requests, queue):
+    os.environ["CACHE_URL"] = cache_url
+    import cache
+    cache.CACHE_URL = cache_url
+    store = cache.make_cache('bench', maxsize=KEYS, ttl=3600)
+    rng = random.Random(seed)
+    hits, timings = 0, []
+    for _ in range(requests):
+        # Popularidade tipo Zipf: poucos títulos concentram a maior parte das requisições
+        key = f"tt{int(rng.paretovariate(0.4)) % KEYS:07d}"
+        start = time.perf_counter()
+        value = store.get(key)
+        timings.append((time.perf_counter() - start) * 1e6)
+        if value is None:
+            store.set(key, {"streams": [{"name": "Netcine - DUBLADO", "url": f"https://cdn.example/{key}.mp4"}]})
+        else:
+            hits += 1
+    queue.put((hits, statistics.median(timings)))
+
+
+def run(cache_url, workers, requests):
+    queue = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(cache_url, n, requests, queue)) for n in range(workers)]
+    for proc in procs:
+        proc.start()
+    results = [queue.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    hits = sum(r[0] for r in results)
+    return hits / (workers * requests), statistics.median(r[1] for r in results)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    tmp = tempfile.mkdtemp(prefix="bench_cache_")
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "benchmarks", "resp_server.py"), "0"],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stdout.readline().strip().rsplit(':', 1)[1])
+        print(f"{workers} workers x {requests} requisições, {KEYS} chaves")
+        print(f"{'backend':<10}{'acertos':>10}{'get p50 (us)':>15}")
+        for label, url in (('memory', 'memory://'),
+                           ('sqlite', f"sqlite:///{os.path.join(tmp, 'cache.db')}"),
+                           ('redis', f"redis://127.0.0.1:{port}/0")):
+            hit_rate, latency = run(url, workers, requests)
+            print(f"{label:<10}{hit_rate:>9.1%}{latency:>15.1f}")
+    finally:
+        server.terminate()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
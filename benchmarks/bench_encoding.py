@@ -0,0 +1,82 @@
+"""
+Custo de serializar e comprimir as respostas do addon: JSONResponse padrão contra
+encoding.FastJSONResponse (orjson quando instalado), tamanho do corpo cru, com gzip e com
+brotli (se instalado), e o ganho do corpo comprimido guardado pelo ETag (encoding.compress
+com cache=True) para respostas que se repetem.
+
+Os corpos vêm do 'Json/': todos os episódios de uma série grande e um catálogo de 100 itens.
+
+Uso: python benchmarks/bench_encoding.py [repeticoes]
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+import encoding
+from encoding import FastJSONResponse, compress
+from http_cache import etag
+
+
+def load_bodies():
+    with open(os.path.join(ROOT, "Json", "tt0121955.json"), 'r', encoding='utf-8') as f:
+        series = json.load(f)
+    streams = [stream for item in series['streams'] for stream in item.get('streams', [])]
+    catalog = [{"id": f"tt{n:07d}", "type": "movie", "name": f"Título {n}", "poster": f"https://m.media-amazon.com/images/M/{n}.jpg",
+                "description": "Descrição do título com acentuação: ação, comédia e ficção científica."} for n in range(100)]
+    return {
+        "stream (temporada inteira)": {"streams": streams},
+        "stream (um episódio)": {"streams": series['streams'][0].get('streams', [])},
+        "catálogo (100 itens)": {"metas": catalog},
+    }
+
+
+def fake_request(accept_encoding):
+    headers = [(b'accept-encoding', accept_encoding.encode())] if accept_encoding else []
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers, 'query_string': b''})
+
+
+def per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"orjson: {'sim' if encoding.orjson else 'não'}, brotli: {'sim' if encoding.brotli else 'não'}")
+    codecs = ['gzip'] + (['br'] if encoding.brotli else [])
+    for name, content in load_bodies().items():
+        body = FastJSONResponse(content).body
+        assert json.loads(body) == json.loads(JSONResponse(content).body)
+        print(f"\n{name}: {len(body)} bytes crus, " +
+              ", ".join(f"{codec} {len(encoding.encode(body, codec))} bytes" for codec in codecs))
+        print(f"  {'JSONResponse':<28} {per_call(lambda: JSONResponse(content), repeats):9.1f} µs")
+        print(f"  {'FastJSONResponse':<28} {per_call(lambda: FastJSONResponse(content), repeats):9.1f} µs")
+        if len(body) < encoding.COMPRESS_MIN_SIZE:
+            print(f"  abaixo de COMPRESS_MIN_SIZE ({encoding.COMPRESS_MIN_SIZE} bytes): vai sem compressão")
+            continue
+        tag = etag(body)
+        for codec in codecs:
+            request = fake_request(codec)
+
+            def respond(cache):
+                response = FastJSONResponse(content)
+                response.headers['ETag'] = tag
+                return compress(request, response, cache=cache)
+
+            response = respond(True)
+            assert response.headers['content-encoding'] == codec and response.headers['etag'] != tag
+            print(f"  {'+ ' + codec:<28} {per_call(lambda: respond(False), repeats):9.1f} µs")
+            print(f"  {'+ ' + codec + ' (em cache)':<28} {per_call(lambda: respond(True), repeats):9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Carga concorrente no addon (uvicorn) contra o servidor mock de benchmarks/mock_server.py:
+latência p50/p95/p99, vazão e erros de /manifest.json, /catalog e /stream, sem rede.
+
+A primeira passada de cada cenário pega os caches frios; as seguintes medem o caminho quente.
+
+Uso: python benchmarks/bench_load.py [--requests 200] [--concurrency 16] [--workers 1]
+         [--latency 0.05] [--failure-rate 0.0]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+import mock_server
+
+SCENARIOS = [
+    ("manifest", ["/manifest.json"]),
+    ("catalog", ["/catalog/movie/skyflix/search=Oppenheimer.json", "/catalog/series/skyflix/search=The Office.json"]),
+    ("stream filme", ["/stream/movie/tt15398776.json"]),
+    ("stream série", [f"/stream/series/tt0386676:{s}:{e}.json" for s in (1, 2) for e in (1, 2, 3)]),
+    ("stream local", ["/stream/series/tt0121955:1:1.json"]),
+]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def start_app(port, upstream, workers, cache_dir):
+    env = dict(os.environ, HTTP_UPSTREAM_OVERRIDE=upstream, RATE_LIMIT="100000/second",
+               CACHE_URL=f"sqlite:///{os.path.join(cache_dir, 'cache.db')}" if workers > 1 else "",
+               IMDB_CACHE_PATH=os.path.join(cache_dir, 'imdb.json'), PREFETCH="0")
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app:app", "--port", str(port),
+                                "--workers", str(workers), "--log-level", "warning"],
+                               cwd=os.path.dirname(ROOT), env=env)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base + "/manifest.json", timeout=1)
+            return process, base
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("app não subiu")
+
+
+def run(base, paths, total, concurrency):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def one(i):
+        start = time.perf_counter()
+        try:
+            response = session.get(base + paths[i % len(paths)], timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    timings = [ms for ms, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    return timings, errors, elapsed
+
+
+def report(name, timings, errors, elapsed):
+    print(f"{name:<22} n={len(timings):<5} p50={percentile(timings, 50):8.1f}ms p95={percentile(timings, 95):8.1f}ms "
+          f"p99={percentile(timings, 99):8.1f}ms média={statistics.mean(timings):8.1f}ms "
+          f"{len(timings) / elapsed:8.1f} req/s erros={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    mock, upstream = mock_server.start(0, mock_server.MockConfig(args.latency, args.jitter, args.failure_rate))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        process, base = start_app(args.port, upstream, args.workers, cache_dir)
+        try:
+            print(f"upstream {upstream} (latência {args.latency * 1000:.0f}ms, falhas {args.failure_rate:.0%}), "
+                  f"{args.workers} worker(s), concorrência {args.concurrency}")
+            for name, paths in SCENARIOS:
+                report(f"{name} (frio)", *run(base, paths, len(paths), args.concurrency))
+                report(name, *run(base, paths, args.requests, args.concurrency))
+            print("requisições ao upstream:", dict(sorted(mock.config.requests.items())))
+        finally:
+            process.terminate()
+            process.wait()
+            mock.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compara o JSON local lido a cada requisição (json.load) com o índice em memória
+(LocalStore) e com o catálogo compilado em SQLite (CompiledStore).
+
+Uso: python benchmarks/bench_local_store.py [copias]
+
+Os arquivos de 'Json/' são replicados 'copias' vezes com ids sintéticos numa pasta
+temporária para simular um catálogo grande. Cada modo roda num subprocesso para
+medir a memória (RSS máximo) de forma isolada.
+"""
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LOOKUPS = 5000
+
+
+def build_catalog(directory, copies):
+    keys = []
+    for name in sorted(os.listdir(os.path.join(ROOT, "Json"))):
+        with open(os.path.join(ROOT, "Json", name), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        original_id = data['id']
+        for n in range(copies):
+            imdb_id = f"{original_id}{n:05d}"
+            data['id'] = imdb_id
+            with open(os.path.join(directory, f"{imdb_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            for item in data.get('streams', []):
+                if 'temporada' in item:
+                    keys.append((imdb_id, 'series', item['temporada'], item['episodio']))
+            if not any('temporada' in item for item in data.get('streams', [])):
+                keys.append((imdb_id, 'movie', None, None))
+    return keys
+
+
+def json_lookup(directory, imdb_id, content_type, season, episode):
+    # Caminho antigo do app.stream: os.path.exists + json.load + busca linear
+    json_path = os.path.join(directory, f"{imdb_id}.json")
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            local_data = json.load(f)
+        if local_data.get('id') == imdb_id:
+            if content_type == 'series' and season and episode:
+                for item in local_data.get('streams', []):
+                    if item.get('temporada') == season and item.get('episodio') == episode:
+                        return item.get('streams', [])
+            elif content_type == 'movie':
+                return local_data.get('streams', [])
+    return []
+
+
+def run_mode(mode, directory, db_path, keys_path):
+    from local_store import LocalStore
+
+    with open(keys_path, 'r', encoding='utf-8') as f:
+        keys = [tuple(k) for k in json.load(f)]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'json':
+        lookup = lambda *k: json_lookup(directory, *k)
+    elif mode == 'index':
+        lookup = LocalStore(directory, reload_interval=3600).lookup
+    else:
+        lookup = LocalStore(directory, reload_interval=3600, compiled=db_path).lookup
+    setup = time.perf_counter() - start
+
+    random.seed(0)
+    timings = []
+    for key in random.choices(keys, k=LOOKUPS):
+        t = time.perf_counter()
+        assert lookup(*key)
+        timings.append((time.perf_counter() - t) * 1e6)
+    timings.sort()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+    print(json.dumps({
+        "mode": mode, "setup_s": round(setup, 3), "rss_kb": rss,
+        "p50_us": round(statistics.median(timings), 1),
+        "p99_us": round(timings[int(len(timings) * 0.99)], 1),
+    }))
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    tmp = tempfile.mkdtemp(prefix="bench_local_store_")
+    try:
+        directory = os.path.join(tmp, "Json")
+        os.mkdir(directory)
+        keys = build_catalog(directory, copies)
+        keys_path = os.path.join(tmp, "keys.json")
+        with open(keys_path, 'w', encoding='utf-8') as f:
+            json.dump(keys, f)
+        db_path = os.path.join(tmp, "catalog.db")
+
+        from local_store import compile_catalog
+        start = time.perf_counter()
+        count = compile_catalog(directory, db_path)
+        print(f"{count} títulos, {len(keys)} chaves; compilação {time.perf_counter() - start:.2f}s, "
+              f"JSON {sum(os.path.getsize(os.path.join(directory, n)) for n in os.listdir(directory)) // 1024} KB, "
+              f"SQLite {os.path.getsize(db_path) // 1024} KB")
+        print(f"{'modo':<10}{'setup (s)':>12}{'RSS (KB)':>12}{'p50 (us)':>12}{'p99 (us)':>12}")
+        for mode in ('json', 'index', 'compiled'):
+            out = subprocess.run([sys.executable, __file__, '--mode', mode, directory, db_path, keys_path],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out)
+            print(f"{r['mode']:<10}{r['setup_s']:>12}{r['rss_kb']:>12}{r['p50_us']:>12}{r['p99_us']:>12}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--mode':
+        run_mode(*sys.argv[2:6])
+    else:
+        main()
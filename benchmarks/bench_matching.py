@@ -0,0 +1,110 @@
+"""
+Acurácia, buscas '?s=' feitas e tempo de CPU do matching de títulos do netcine:
+a cascata antiga (benchmarks/legacy_matching.py) contra matching.best_match
+usado em netcine.scrape_search.
+
+Uso: python benchmarks/bench_matching.py [repeticoes]
+"""
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import http_client  # noqa: E402
+import netcine  # noqa: E402
+import legacy_matching  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+MIRROR = 'https://netcine.lat/'
+
+# Termo buscado -> página de resultados gravada; outros termos recebem uma página sem o título
+PAGES = {
+    'The Office': 'netcine_search_series.html',
+    'Oppenheimer': 'netcine_search_movie.html',
+    'Duna': 'netcine_search_duna.html',
+    'Operação Rio': 'netcine_search_velozes.html',
+    'Episódio IV - Uma Nova Esperança': 'netcine_search_starwars.html',
+    'O Código Da': 'netcine_search_codigo.html',
+    'Arcane': 'netcine_search_arcane.html',
+    'Halloween': 'netcine_search_halloween.html',
+    'Breaking Bad': 'netcine_search_breaking.html',
+    'It: A': 'netcine_search_it.html',
+    'It: Capítulo': 'netcine_search_it.html',
+    'A Coisa': 'netcine_search_it.html',
+    'Capítulo Dois': 'netcine_search_it.html',
+}
+
+# (títulos do IMDb [nome, nome alternativo], ano, tipo, link esperado)
+CASES = [
+    (['The Office'], '2005', 'tvshows', MIRROR + 'tvshows/the-office/'),
+    (['Oppenheimer'], '2023', 'movies', MIRROR + 'oppenheimer/'),
+    (['Duna'], '2021', 'movies', MIRROR + 'duna-2021/'),
+    (['Duna'], '1984', 'movies', MIRROR + 'duna-1984/'),
+    (['Fast Five', 'Velozes & Furiosos 5: Operação Rio'], '2011', 'movies', MIRROR + 'velozes-e-furiosos-5/'),
+    (['Star Wars', 'Star Wars: Episódio IV - Uma Nova Esperança'], '1977', 'movies', MIRROR + 'star-wars-uma-nova-esperanca/'),
+    (['The Da Vinci Code', 'O Código Da Vinci'], '2006', 'movies', MIRROR + 'o-codigo-da-vinci/'),
+    (['Arcane'], '2021', 'tvshows', MIRROR + 'tvshows/arcane/'),
+    (['Halloween'], '2018', 'movies', ''),
+    (['Breaking Bad'], '2008', 'tvshows', MIRROR + 'tvshows/breaking-bad/'),
+    (['It', 'It: A Coisa'], '2017', 'movies', MIRROR + 'it-a-coisa/'),
+    (['It Chapter Two', 'It: Capítulo Dois'], '2019', 'movies', MIRROR + 'it-capitulo-dois/'),
+]
+
+
+class Response:
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+
+
+def load_pages():
+    pages = {}
+    for name in set(PAGES.values()) | {'netcine_search_empty.html'}:
+        with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+            pages[name] = f.read()
+    return pages
+
+
+def run(scrape_search, pages, searches):
+    def get(url, headers=None, **kwargs):
+        if not urlparse(url).query:
+            return Response(MIRROR, '')
+        term = parse_qs(urlparse(url).query)['s'][0]
+        searches.append(term)
+        return Response(url, pages[PAGES.get(term, 'netcine_search_empty.html')])
+
+    legacy_matching.requests.get = get
+    http_client.get = get
+    hits = 0
+    for titles, year, kind, expected in CASES:
+        text, alternate = titles[-1], titles[0]
+        try:
+            link, _ = scrape_search(netcine.HOST, dict(netcine.HEADERS), text, alternate, year, kind)
+        except Exception:
+            link = ''
+        hits += link == expected
+    return hits
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages = load_pages()
+    print(f"{len(CASES)} casos, {repeat} repetições")
+    print(f"{'versão':<10}{'acertos':>10}{'buscas':>10}{'CPU/caso (ms)':>16}")
+    for label, func in (('antes', legacy_matching.scrape_search), ('depois', netcine.scrape_search)):
+        searches = []
+        hits = run(func, pages, searches)
+        requests = len(searches)
+        start = time.process_time()
+        for _ in range(repeat):
+            run(func, pages, [])
+        cpu = (time.process_time() - start) * 1000 / repeat / len(CASES)
+        print(f"{label:<10}{hits:>7}/{len(CASES):<2}{requests:>10}{cpu:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Tempo de CPU por página dos parsers dos scrapers: página inteira com html.parser
+(como era) contra o parse da região com parsing.parse (lxml quando instalado).
+
+Uso: python benchmarks/bench_parsing.py [repeticoes]
+"""
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parsing import parse, FEATURES  # noqa: E402
+from gofilmes import select_panels  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def cssmenu(soup):
+    menu = soup.find('div', {'id': 'cssmenu'}).find('ul').find_all('li', {'class': 'has-sub'})
+    return [[li.find('a').get('href') for li in season.find('ul').find_all('li')] for season in menu]
+
+
+def box_movies(soup):
+    return [movie.find('h2').text for movie in soup.find('div', {'id': 'box_movies'}).find_all('div', {'class': 'movie'})]
+
+
+def player_container(soup):
+    player = soup.find('div', {'id': 'player-container'})
+    return [a.get('href') for a in player.find('ul', {'class': 'player-menu'}).find_all('a')] + \
+        [iframe.get('src') for iframe in player.find('div', {'class': 'play-c'}).find_all('iframe')]
+
+
+def content_link(soup):
+    return soup.find('div', {'id': 'content'}).find_all('a')[0].get('href', '')
+
+
+def panels(soup):
+    return [[a['href'] for a in panel.select('div.ep a[href], li a[href]')] for panel in select_panels(soup)]
+
+
+def links(soup):
+    return [a['href'] for a in soup.select('div.link a[href]')]
+
+
+def player(soup):
+    iframe = soup.find('iframe')
+    return (iframe.get('src') if iframe else None, [s.string for s in soup.find_all('script') if s.string])
+
+
+# (arquivo, extração, argumentos do SoupStrainer usados no scraper)
+CASES = [
+    ('netcine_search_series.html', box_movies, ('div',), {'id': 'box_movies'}),
+    ('netcine_search_movie.html', box_movies, ('div',), {'id': 'box_movies'}),
+    ('netcine_show.html', cssmenu, ('div',), {'id': 'cssmenu'}),
+    ('netcine_episode.html', player_container, ('div',), {'id': 'player-container'}),
+    ('netcine_player.html', content_link, ('div',), {'id': 'content'}),
+    ('gofilmes_series.html', panels, ('div',), {'class_': ['panel', 'seasons', 'season']}),
+    ('gofilmes_movie.html', links, ('div',), {'class_': 'link'}),
+    ('gofilmes_player_iframe.html', player, (['iframe', 'script'],), {}),
+]
+
+
+def cpu_ms(func, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - start) * 1000 / repeat, result
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    print(f"backend: {FEATURES}; {repeat} repetições por página")
+    print(f"{'página':<30}{'KB':>6}{'antes (ms)':>12}{'depois (ms)':>13}{'ganho':>8}")
+    total_before = total_after = 0
+    for name, extract, args, kwargs in CASES:
+        with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+            html = f.read()
+        before, expected = cpu_ms(lambda: extract(BeautifulSoup(html, 'html.parser')), repeat)
+        after, result = cpu_ms(lambda: extract(parse(html, *args, **kwargs)), repeat)
+        assert result == expected, name
+        total_before += before
+        total_after += after
+        print(f"{name:<30}{len(html) // 1024:>6}{before:>12.2f}{after:>13.2f}{before / after:>7.1f}x")
+    print(f"{'total':<36}{total_before:>12.2f}{total_after:>13.2f}{total_before / total_after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
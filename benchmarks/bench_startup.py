@@ -0,0 +1,73 @@
+"""
+Subida a frio do addon com FAST_START=0 (carrega tudo na subida) e FAST_START=1 (serverless):
+tempo de 'import app', tempo até o primeiro /manifest.json responder num uvicorn novo e a
+latência das primeiras requisições que carregam o template, o índice local e os scrapers.
+
+Os scrapers usam o servidor mock de benchmarks/mock_server.py, sem rede.
+
+Uso: python benchmarks/bench_startup.py [repeticoes]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+import mock_server
+
+PORT = 8902
+FIRST_REQUESTS = [
+    ("/ (template)", "/"),
+    ("/stream local", "/stream/series/tt0121955:1:1.json"),
+    ("/stream raspado", "/stream/movie/tt15398776.json"),
+]
+IMPORT_SNIPPET = "import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)"
+
+
+def measure(fast_start, upstream):
+    env = dict(os.environ, FAST_START=fast_start, HTTP_UPSTREAM_OVERRIDE=upstream, RATE_LIMIT="100000/second", PREFETCH="0")
+    cwd = os.path.dirname(ROOT)
+    result = {"import app": float(subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, cwd=cwd,
+                                                 capture_output=True, text=True, check=True).stdout)}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app:app", "--port", str(PORT), "--log-level", "warning"],
+                               env=env, cwd=cwd)
+    base = f"http://127.0.0.1:{PORT}"
+    try:
+        while True:
+            try:
+                requests.get(base + "/manifest.json", timeout=1)
+                break
+            except requests.RequestException:
+                if process.poll() is not None:
+                    raise RuntimeError("app não subiu")
+                time.sleep(0.005)
+        result["1ª resposta (/manifest.json)"] = time.perf_counter() - start
+        for name, path in FIRST_REQUESTS:
+            request_start = time.perf_counter()
+            requests.get(base + path, timeout=30)
+            result[name] = time.perf_counter() - request_start
+    finally:
+        process.terminate()
+        process.wait()
+    return result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    mock, upstream = mock_server.start(0, mock_server.MockConfig(latency=0.02))
+    for fast_start in ("0", "1"):
+        runs = [measure(fast_start, upstream) for _ in range(repeats)]
+        print(f"FAST_START={fast_start} (mediana de {repeats})")
+        for name in runs[0]:
+            print(f"  {name:<30} {statistics.median(run[name] for run in runs) * 1000:8.1f} ms")
+    mock.shutdown()
+
+
+if __name__ == "__main__":
+    main()
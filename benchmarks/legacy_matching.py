@@ -0,0 +1,197 @@
+"""
+Cópia do matching antigo de netcine.scrape_search (check_item + cascata de elif),
+mantida só como referência para benchmarks/bench_matching.py.
+"""
+import types
+from urllib.parse import urlparse, quote_plus
+from bs4 import BeautifulSoup
+
+# O benchmark troca requests.get por uma função que serve as fixtures
+requests = types.SimpleNamespace(get=None)
+
+
+def check_item(search,headers,year_imdb,text):
+    r = requests.get(search,headers=headers)
+    src = r.text
+    soup = BeautifulSoup(src,'html.parser')
+    box = soup.find("div", {"id": "box_movies"})
+    movies = box.findAll("div", {"class": "movie"})
+    count = 0
+    for i in movies:
+        try:
+            year = i.find('span', {'class': 'year'}).text
+            year = year.replace('–', '')
+        except:
+            year = ''
+        name = i.find('h2').text
+        try:
+            name = name.decode('utf-8')
+        except: pass
+        try:
+            name = name.decode()
+        except: pass           
+        if ':' in text:
+            text_search = text.split(':')[1].replace(' ', '').lower()
+            name_search = name.replace(' ', '').lower()
+            if text_search in name_search:
+                count += 1
+                break
+        else:
+            if str(year_imdb) in str(year):
+                count += 1
+                break
+            elif str(int(year_imdb) + 1) in str(year):
+                count += 1         
+                break
+            elif str(int(year_imdb) - 1) in str(year):
+                count += 1
+                break
+    if count > 0:
+        return movies
+    else:
+        return []        
+
+def scrape_search(host,headers,text,alternate,year_imdb,type):
+    text = text.replace('&amp;', '&')
+    alternate = alternate.replace('&amp;', '&')
+    url = requests.get(host,headers=headers).url
+    url_parsed = urlparse(url)
+    new_host = url_parsed.scheme + '://' + url_parsed.hostname + '/'
+    try:
+        keys_search = text.split(' ')
+        search_ = ' '.join(keys_search[:-1]) if len(keys_search) > 2 else text
+    except: search_ = text
+    try:
+        if len(search_.split(' ')) > 2 and ':' in text:
+            search_ = text.split(': ')[1]
+    except: pass   
+    url_search = new_host + '?s=' + quote_plus(search_)
+    headers.update({'Cookie': 'XCRF%3DXCRF'})
+    movies = check_item(url_search,headers,year_imdb,text)
+    if not movies:
+        try:
+            if ':' in text:
+                param_search = text.split(':')[1]
+                url_search2 = new_host + '?s=' + quote_plus(param_search)
+                movies = check_item(url_search2,headers,year_imdb,text)
+        except: movies = []
+    for i in movies:
+        name = i.find('h2').text
+        try: name = name.decode('utf-8')
+        except: pass
+        name_backup = name
+        text_backup = text
+        textalternate_backup = alternate
+        try:
+            keys = name.split(' ')
+            name2 = ' '.join(keys[:-1])
+        except: name2 = ''
+        try:
+            keys2 = text.split(' ')
+            text2 = ' '.join(keys2[:-1])
+        except: text2 = ''                           
+        try:
+            year = i.find('span', {'class': 'year'}).text
+            year = year.replace('–', '')
+        except:
+            year = ''
+        try:
+            text = text.lower().replace(':', '')
+        except: pass
+        try:
+            textalternate = alternate.lower().replace(':', '')
+        except: pass        
+        try:
+            name = name.lower().replace(':', '')
+        except: pass
+        try:
+            text2 = text2.lower()
+        except: pass
+        try:
+            name2 = name2.lower()
+        except: pass
+        try:
+            name3 = name2.replace(' –', ':')
+        except: name3 = ''
+        try:
+            count_text = len(name3.split(' '))
+        except: count_text = 0
+        try:
+            if ':' in name_backup:
+                name4 = name_backup.split(': ')[1].lower()
+            else: name4 = ''
+        except: name4 = ''
+        try:
+            if ':' in text_backup:
+                text3 = text_backup.split(': ')[1].lower()
+            else: text3 = ''
+        except: text3 = ''
+        try:
+            if ':' in textalternate_backup:
+                textalternate2 = textalternate_backup.split(': ')[1].lower()
+            else: textalternate2 = ''
+        except: textalternate2 = ''            
+        if '&' in text:
+            text4 = text.replace('&', 'e')
+        else: text4 = text
+        if '&' in name and not '&amp;' in name:
+            name5 = name.replace('&', 'e')
+        else: name5 = name
+        if ' e ' in text:
+            text5 = text.replace(' e ', ' & ')
+        else: text5 = text 
+        if ' e ' in name:
+            name6 = name.replace(' e ', ' & ')
+        else: name6 = name
+        try:
+            count_text2 = len(text.split(' '))
+        except: count_text2 = 0
+        try:
+            img = i.find('div', {'class': 'imagen'})
+            link = img.find('a').get('href', '')
+        except: link = ''
+        count_name_ = len(name)
+        count_text_ = len(text)
+        if type == 'tvshows' and '/tvshows/' in link:
+            if text in name and str(year_imdb) in str(year) or text2 in name2 and str(year_imdb) in str(year):
+                return link, new_host
+            elif text2 in name3 and str(year_imdb) in str(year):
+                return link, new_host 
+            elif text2 in name3 and str(int(year_imdb) + 1) in str(year) and count_text > 1 and not count_name_ > count_text_:     
+                return link, new_host
+            elif text2 in name3 and str(int(year_imdb) - 1) in str(year) and count_text > 1 and not count_name_ > count_text_:    
+                return link, new_host
+            elif text3 in name4 and str(year_imdb) in str(year) and text3 and name4:
+                return link, new_host
+            elif text4 in name5 and str(year_imdb) in str(year) and text4 and name5:               
+                return link, new_host
+            elif len(text5) == len(name6) and str(year_imdb) in str(year) and text5 and name6:              
+                return link, new_host
+            elif textalternate in name and str(year_imdb) in str(year) or textalternate2 in name4 and str(year_imdb) in str(year):
+                return link, new_host
+            elif text in name and str(int(year_imdb) + 1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
+                return link, new_host
+            elif text in name and str(int(year_imdb) -1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
+                return link, new_host              
+        elif type == 'movies' and not '/tvshows/' in link: 
+            if text in name and str(year_imdb) in str(year) or text2 in name2 and str(year_imdb) in str(year):
+                return link, new_host
+            elif text2 in name3 and str(year_imdb) in str(year):
+                return link, new_host 
+            elif text2 in name3 and str(int(year_imdb) + 1) in str(year) and count_text > 1 and not count_name_ > count_text_:     
+                return link, new_host
+            elif text2 in name3 and str(int(year_imdb) - 1) in str(year) and count_text > 1 and not count_name_ > count_text_:    
+                return link, new_host
+            elif text3 in name4 and str(year_imdb) in str(year) and text3 and name4:
+                return link, new_host
+            elif text4 in name5 and str(year_imdb) in str(year) and text4 and name5:               
+                return link, new_host
+            elif len(text5) == len(name6) and str(year_imdb) in str(year) and text5 and name6:              
+                return link, new_host
+            elif textalternate in name and str(year_imdb) in str(year) or textalternate2 in name4 and str(year_imdb) in str(year):
+                return link, new_host
+            elif text in name and str(int(year_imdb) + 1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
+                return link, new_host
+            elif text in name and str(int(year_imdb) -1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
+                return link, new_host                                                            
+    return '', ''
@@ -0,0 +1,173 @@
+"""
+Servidor HTTP local que imita IMDb, netcine, GoFilmes e streamtape com as páginas gravadas
+em benchmarks/fixtures, para medir o addon sem acesso à rede.
+
+O app manda as chamadas para cá com HTTP_UPSTREAM_OVERRIDE=http://127.0.0.1:<porta>
+(ver http_client.py): https://host/caminho chega como /host/caminho.
+
+Uso: python benchmarks/mock_server.py [--port 8900] [--latency 0.05] [--jitter 0.5]
+         [--failure-rate 0.0] [--host-latency netcine.lat=0.3 ...] [--host-failure gofilmess.top=0.5 ...]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MIRROR = 'netcine.lat'
+
+# Termo da busca '?s=' do netcine -> página de resultados
+SEARCHES = {
+    'The Office': 'netcine_search_series.html',
+    'Oppenheimer': 'netcine_search_movie.html',
+    'Duna': 'netcine_search_duna.html',
+    'Operação Rio': 'netcine_search_velozes.html',
+    'Episódio IV - Uma Nova Esperança': 'netcine_search_starwars.html',
+    'O Código Da': 'netcine_search_codigo.html',
+    'Arcane': 'netcine_search_arcane.html',
+    'Halloween': 'netcine_search_halloween.html',
+    'Breaking Bad': 'netcine_search_breaking.html',
+    'It: A': 'netcine_search_it.html',
+    'It: Capítulo': 'netcine_search_it.html',
+}
+
+# (host, regex do caminho, fixture); a primeira rota que casar responde
+ROUTES = [
+    ('v3.sg.media-imdb.com', r'^/suggestion/', 'imdb_suggestion.json'),
+    ('www.imdb.com', r'^/pt/title/(tt\d+)/$', 'imdb_title_{0}.html'),
+    (MIRROR, r'^/tvshows/', 'netcine_show.html'),
+    (MIRROR, r'^/episode/', 'netcine_episode.html'),
+    (MIRROR, r'^/player/video\.php', 'netcine_video.html'),
+    (MIRROR, r'^/player/', 'netcine_player.html'),
+    (MIRROR, r'^/[^/]+/$', 'netcine_movie.html'),
+    ('gofilmess.top', r'^/series/', 'gofilmes_series.html'),
+    ('gofilmess.top', r'^/(assistir|player)/', 'gofilmes_player.html'),
+    ('gofilmess.top', r'^/[^/]+$', 'gofilmes_movie.html'),
+    ('streamtape.com', r'^/e/', 'streamtape.html'),
+]
+
+
+class MockConfig:
+    def __init__(self, latency=0.05, jitter=0.5, failure_rate=0.0, host_latency=None, host_failure=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.host_latency = host_latency or {}
+        self.host_failure = host_failure or {}
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def delay(self, host):
+        base = self.host_latency.get(host, self.latency)
+        return max(base * (1 + random.uniform(-self.jitter, self.jitter)), 0)
+
+    def fails(self, host):
+        return random.random() < self.host_failure.get(host, self.failure_rate)
+
+    def count(self, host):
+        with self.lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+
+def route(host, path, query):
+    """
+    Devolve (status, cabeçalhos, nome da fixture ou None).
+    """
+    if host == 'netcinez.si':
+        return 302, {'Location': f'/{MIRROR}/'}, None
+    if host == MIRROR and path == '/':
+        if 's' in query:
+            return 200, {}, SEARCHES.get(query['s'][0], 'netcine_search_empty.html')
+        return 200, {}, 'netcine_search_empty.html'
+    if path.endswith(('.m3u8', '.mp4')) or path.startswith('/get_video'):
+        # Links de vídeo de qualquer CDN (testados pelo probe.py)
+        return 200, {}, 'stream.m3u8'
+    for route_host, pattern, fixture in ROUTES:
+        match = re.match(pattern, path)
+        if route_host == host and match:
+            name = fixture.format(*match.groups())
+            if os.path.exists(os.path.join(FIXTURES, name)):
+                return 200, {}, name
+    return 404, {}, None
+
+
+def make_handler(config, cache):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            host, _, path = parsed.path.lstrip('/').partition('/')
+            config.count(host)
+            time.sleep(config.delay(host))
+            if config.fails(host):
+                self._send(503, {}, b'Service Unavailable')
+                return
+            status, headers, fixture = route(host, '/' + path, parse_qs(parsed.query))
+            body = b''
+            if fixture:
+                if fixture not in cache:
+                    with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+                        cache[fixture] = f.read()
+                body = cache[fixture]
+                headers['Content-Type'] = {'.json': 'application/json', '.m3u8': 'application/vnd.apple.mpegurl'}.get(
+                    os.path.splitext(fixture)[1], 'text/html; charset=utf-8')
+            self._send(status, headers, body)
+
+        def _send(self, status, headers, body):
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(port=0, config=None):
+    """
+    Sobe o servidor numa thread e devolve (servidor, url base).
+    """
+    config = config or MockConfig()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(config, {}))
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def parse_pairs(pairs):
+    return {host: float(value) for host, value in (pair.split('=', 1) for pair in pairs or [])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.05, help="latência média por requisição (s)")
+    parser.add_argument('--jitter', type=float, default=0.5, help="variação relativa da latência")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="fração das requisições que recebem 503")
+    parser.add_argument('--host-latency', nargs='*', help="host=segundos")
+    parser.add_argument('--host-failure', nargs='*', help="host=fração")
+    args = parser.parse_args()
+    config = MockConfig(args.latency, args.jitter, args.failure_rate,
+                        parse_pairs(args.host_latency), parse_pairs(args.host_failure))
+    server, url = start(args.port, config)
+    print(f"mock em {url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
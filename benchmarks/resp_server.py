@@ -0,0 +1,133 @@
+"""
+Servidor local que fala o protocolo do Redis (RESP) com os comandos usados por cache.RedisCache.
+Serve de substituto do Redis para benchmarks e testes locais, sem instalar nada.
+
+Uso: python benchmarks/resp_server.py [porta]
+"""
+import asyncio
+import fnmatch
+import sys
+import time
+
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.zsets = {}
+
+    def _alive(self, key):
+        expires = self.expires.get(key)
+        if expires is not None and expires < time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data or key in self.zsets
+
+    def execute(self, name, args):
+        name = name.upper()
+        if name in ('PING',):
+            return 'PONG'
+        if name in ('SELECT', 'AUTH'):
+            return 'OK'
+        if name == 'GET':
+            return self.data.get(args[0]) if self._alive(args[0]) else None
+        if name == 'SET':
+            key, value = args[0], args[1]
+            self.data[key] = value
+            self.expires.pop(key, None)
+            options = [a.upper() for a in args[2:]]
+            if 'PX' in options:
+                self.expires[key] = time.time() + int(args[2 + options.index('PX') + 1]) / 1000
+            elif 'EX' in options:
+                self.expires[key] = time.time() + int(args[2 + options.index('EX') + 1])
+            return 'OK'
+        if name == 'DEL':
+            count = 0
+            for key in args:
+                count += (self.data.pop(key, None) is not None) + (self.zsets.pop(key, None) is not None)
+                self.expires.pop(key, None)
+            return count
+        if name == 'SCAN':
+            pattern = args[args.index('MATCH') + 1] if 'MATCH' in args else '*'
+            keys = [k for k in list(self.data) if self._alive(k) and fnmatch.fnmatchcase(k, pattern)]
+            return ['0', keys]
+        if name == 'ZADD':
+            zset = self.zsets.setdefault(args[0], {})
+            added = 0
+            for score, member in zip(args[1::2], args[2::2]):
+                added += member not in zset
+                zset[member] = float(score)
+            return added
+        if name == 'ZCARD':
+            return len(self.zsets.get(args[0], {}))
+        if name == 'ZREM':
+            zset = self.zsets.get(args[0], {})
+            return sum(zset.pop(member, None) is not None for member in args[1:])
+        if name == 'ZPOPMIN':
+            zset = self.zsets.get(args[0], {})
+            count = int(args[1]) if len(args) > 1 else 1
+            popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+            reply = []
+            for member, score in popped:
+                del zset[member]
+                reply += [member, repr(score)]
+            return reply
+        if name == 'FLUSHDB':
+            self.__init__()
+            return 'OK'
+        return Exception(f"ERR unknown command '{name}'")
+
+
+def encode(value):
+    if isinstance(value, Exception):
+        return b'-%s\r\n' % str(value).encode()
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(encode(v) for v in value)
+    if value in ('OK', 'PONG'):
+        return b'+%s\r\n' % value.encode()
+    data = value.encode('utf-8')
+    return b'$%d\r\n%s\r\n' % (len(data), data)
+
+
+async def read_command(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    count = int(line[1:-2])
+    args = []
+    for _ in range(count):
+        size = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(size + 2))[:-2].decode('utf-8'))
+    return args
+
+
+async def serve(port, ready=None):
+    store = Store()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                args = await read_command(reader)
+                if not args:
+                    break
+                writer.write(encode(store.execute(args[0], args[1:])))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', port)
+    if ready:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 6379
+    asyncio.run(serve(port, ready=lambda p: print(f"RESP em 127.0.0.1:{p}", flush=True)))
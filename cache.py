@@ -0,0 +1,410 @@
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, unquote
+
+import metrics
+from singleflight import flight
+
+
+# Backend dos caches: memory:// (padrão, por processo), sqlite:///caminho.db (compartilhado
+# pelos workers da máquina) ou redis://host:porta/db (compartilhado entre máquinas)
+CACHE_URL = os.environ.get("CACHE_URL", "memory://")
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class TTLCache:
+    """
+    Cache em memória com tamanho máximo (LRU) e expiração por TTL.
+    Os valores são guardados em JSON, como no SQLite e no Redis: quem lê recebe sempre uma cópia
+    com os mesmos tipos (tuplas viram listas) em qualquer backend.
+    Se 'path' for informado, o conteúdo é salvo em disco (JSON) e recarregado na inicialização.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600, path=None, save_interval=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_save = time.time()
+        self._dirty = False
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        value = dumps(value)
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._dirty = True
+            if self.path and time.time() - self._last_save > self.save_interval:
+                self.save()
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._dirty = True
+
+    def items(self):
+        """
+        Lista (chave, valor) das entradas ainda válidas.
+        """
+        now = time.time()
+        with self._lock:
+            items = [(key, value) for key, (expires, value) in self._data.items() if expires >= now]
+        return [(key, json.loads(value)) for key, value in items]
+
+    def __len__(self):
+        return len(self._data)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.error(f"Erro ao carregar cache de {self.path}: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, (expires, value) in items:
+                if expires > now:
+                    self._data[key] = (expires, dumps(value))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            items = list(self._data.items())
+            self._dirty = False
+            self._last_save = time.time()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            # Os valores já estão em JSON: vão para o arquivo como estão
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write('[' + ','.join(f'[{dumps(key)},[{expires!r},{value}]]' for key, (expires, value) in items) + ']')
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Erro ao salvar cache em {self.path}: {e}")
+
+
+class SQLiteCache:
+    """
+    Cache num arquivo SQLite compartilhado pelos workers, com a mesma semântica do TTLCache:
+    valores em JSON, expiração por TTL e no máximo 'maxsize' chaves por namespace (LRU).
+    A remoção das chaves excedentes roda a cada poucas escritas, não em todas.
+    """
+
+    evict_every = 32
+
+    def __init__(self, path, namespace, maxsize=1024, ttl=3600):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._sets = 0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                     "expires REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (ns, key)) WITHOUT ROWID")
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (ns, accessed)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT value, expires FROM cache WHERE ns=? AND key=?", (self.namespace, key)).fetchone()
+            now = time.time()
+            if row is None or row[1] < now:
+                return default
+            conn.execute("UPDATE cache SET accessed=? WHERE ns=? AND key=?", (now, self.namespace, key))
+            return json.loads(row[0])
+        except sqlite3.Error as e:
+            logging.error(f"Erro no cache SQLite {self.path}: {e}")
+            return default
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                         (self.namespace, key, dumps(value), now + (self.ttl if ttl is None else ttl), now))
+            self._sets += 1
+            if self._sets % max(min(self.evict_every, self.maxsize // 8), 1) == 0:
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logging.error(f"Erro no cache SQLite {self.path}: {e}")
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM cache WHERE ns=? AND expires<?", (self.namespace, now))
+        count = conn.execute("SELECT COUNT(*) FROM cache WHERE ns=?", (self.namespace,)).fetchone()[0]
+        if count > self.maxsize:
+            conn.execute("DELETE FROM cache WHERE ns=? AND key IN (SELECT key FROM cache WHERE ns=? "
+                         "ORDER BY accessed LIMIT ?)", (self.namespace, self.namespace, count - self.maxsize))
+
+    def delete(self, key):
+        try:
+            self._conn().execute("DELETE FROM cache WHERE ns=? AND key=?", (self.namespace, key))
+        except sqlite3.Error as e:
+            logging.error(f"Erro no cache SQLite {self.path}: {e}")
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache WHERE ns=?", (self.namespace,))
+
+    def items(self):
+        rows = self._conn().execute("SELECT key, value FROM cache WHERE ns=? AND expires>=?", (self.namespace, time.time()))
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache WHERE ns=? AND expires>=?",
+                                    (self.namespace, time.time())).fetchone()[0]
+
+
+class RedisError(Exception):
+    pass
+
+
+class RespConnection:
+    """
+    Cliente mínimo do protocolo do Redis (RESP), uma conexão por thread, sem dependências.
+    """
+
+    def __init__(self, url, timeout=2):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.strip('/') or 0)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock, self._local.file = sock, sock.makefile('rb')
+        if self.password:
+            self._send('AUTH', self.password)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def _send(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self._local.sock.sendall(b''.join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._local.file.readline()
+        if not line:
+            raise ConnectionError("conexão fechada pelo servidor")
+        kind, data = line[:1], line[1:-2]
+        if kind == b'+':
+            return data.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(data.decode('utf-8'))
+        if kind == b':':
+            return int(data)
+        if kind == b'$':
+            size = int(data)
+            if size < 0:
+                return None
+            value = self._local.file.read(size + 2)[:-2]
+            return value.decode('utf-8')
+        if kind == b'*':
+            size = int(data)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise RedisError(f"resposta inválida: {line!r}")
+
+    def command(self, *args):
+        for attempt in (1, 2):
+            try:
+                if getattr(self._local, 'sock', None) is None:
+                    self._connect()
+                return self._send(*args)
+            except (OSError, ConnectionError):
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = self._local.file = None
+
+
+class RedisCache:
+    """
+    Cache num servidor Redis (ou compatível). Valores em JSON com TTL nativo (PX); o limite de
+    'maxsize' chaves por namespace usa um sorted set com o horário do último acesso (LRU).
+    """
+
+    def __init__(self, url, namespace, maxsize=1024, ttl=3600):
+        self.conn = RespConnection(url)
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._prefix = f"fenixsky:{namespace}:"
+        self._lru = f"fenixsky:{namespace}"
+
+    def get(self, key, default=None):
+        try:
+            value = self.conn.command('GET', self._prefix + key)
+            if value is None:
+                return default
+            self.conn.command('ZADD', self._lru, time.time(), key)
+            return json.loads(value)
+        except (OSError, RedisError) as e:
+            logging.error(f"Erro no cache Redis: {e}")
+            return default
+
+    def set(self, key, value, ttl=None):
+        try:
+            ttl_ms = max(int((self.ttl if ttl is None else ttl) * 1000), 1)
+            self.conn.command('SET', self._prefix + key, dumps(value), 'PX', ttl_ms)
+            self.conn.command('ZADD', self._lru, time.time(), key)
+            excess = self.conn.command('ZCARD', self._lru) - self.maxsize
+            if excess > 0:
+                evicted = self.conn.command('ZPOPMIN', self._lru, excess)[::2]
+                self.conn.command('DEL', *[self._prefix + k for k in evicted])
+        except (OSError, RedisError) as e:
+            logging.error(f"Erro no cache Redis: {e}")
+
+    def delete(self, key):
+        try:
+            self.conn.command('DEL', self._prefix + key)
+            self.conn.command('ZREM', self._lru, key)
+        except (OSError, RedisError) as e:
+            logging.error(f"Erro no cache Redis: {e}")
+
+    def _keys(self):
+        cursor, keys = '0', []
+        while True:
+            cursor, batch = self.conn.command('SCAN', cursor, 'MATCH', self._prefix + '*', 'COUNT', 500)
+            keys.extend(batch)
+            if cursor == '0':
+                return keys
+
+    def clear(self):
+        keys = self._keys()
+        if keys:
+            self.conn.command('DEL', *keys)
+        self.conn.command('DEL', self._lru)
+
+    def items(self):
+        items = []
+        for full_key in self._keys():
+            value = self.conn.command('GET', full_key)
+            if value is not None:
+                items.append((full_key[len(self._prefix):], json.loads(value)))
+        return items
+
+    def __len__(self):
+        return len(self._keys())
+
+
+def in_thread(func, *args):
+    """
+    Roda uma chamada ao cache fora do event loop: os backends SQLite e Redis (e o em memória
+    com 'path') fazem I/O bloqueante.
+    """
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def make_cache(namespace, maxsize=1024, ttl=3600, path=None):
+    """
+    Cria o cache 'namespace' no backend configurado em CACHE_URL.
+    Os valores precisam ser serializáveis em JSON e as chaves são strings.
+    'path' (persistência em arquivo) só vale para o backend em memória.
+    """
+    scheme = urlparse(CACHE_URL).scheme
+    if scheme == 'sqlite':
+        # sqlite:///relativo.db ou sqlite:////caminho/absoluto.db
+        return SQLiteCache(CACHE_URL.split('://', 1)[1][1:] or 'cache.db', namespace, maxsize, ttl)
+    if scheme == 'redis':
+        return RedisCache(CACHE_URL, namespace, maxsize, ttl)
+    return TTLCache(maxsize, ttl, path)
+
+
+def memoize(cache, should_cache=bool, ttl=None, key_prefix=''):
+    """
+    Decorator que guarda o resultado da função no cache, usando os argumentos como chave.
+    Chamadas simultâneas com a mesma chave esperam a primeira em vez de repetir o trabalho.
+    Resultados para os quais should_cache(result) é falso não são guardados.
+    'ttl' pode ser um número ou uma função que recebe o resultado e devolve o TTL.
+    Acertos e erros do cache vão para o /metrics com o nome key_prefix (ou o da função).
+    """
+    missing = object()
+
+    def decorator(func):
+        name = key_prefix.rstrip(':') or func.__name__
+
+        def load(key, args):
+            value = cache.get(key, missing)
+            if value is missing:
+                value = func(*args)
+                if should_cache(value):
+                    cache.set(key, value, ttl(value) if callable(ttl) else ttl)
+            return value
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = key_prefix + ':'.join(str(arg) for arg in args)
+            value = cache.get(key, missing)
+            metrics.cache_access(name, value is not missing)
+            if value is not missing:
+                return value
+            return flight.do((id(cache), key), load, key, args)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,137 @@
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi.responses import JSONResponse
+
+from http_cache import conditional
+
+# orjson e brotli são opcionais: sem eles ficam o json da biblioteca padrão e só o gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Respostas menores que isso (bytes) não compensam compressão
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+# Corpos já comprimidos, por ETag e codificação (respostas fixas e do 'Json/')
+ENCODED_CACHE_SIZE = int(os.environ.get("ENCODED_CACHE_SIZE", "512"))
+
+ENCODING_SUFFIX = {'br': '-br', 'gzip': '-gz'}
+
+_encoded = OrderedDict()
+_encoded_lock = threading.Lock()
+
+
+def dumps(content):
+    """
+    JSON compacto em UTF-8, igual ao do JSONResponse, com o orjson quando estiver instalado.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+
+def accepted_encoding(request):
+    """
+    A melhor codificação aceita pelo cliente ('br', 'gzip') ou None, respeitando q=0.
+    """
+    accepted = {}
+    for part in request.headers.get('accept-encoding', '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding == 'br' and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def encode(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def _cached_encode(key, body, encoding):
+    with _encoded_lock:
+        data = _encoded.get(key)
+        if data is not None:
+            _encoded.move_to_end(key)
+            return data
+    data = encode(body, encoding)
+    with _encoded_lock:
+        _encoded[key] = data
+        while len(_encoded) > ENCODED_CACHE_SIZE:
+            _encoded.popitem(last=False)
+    return data
+
+
+def response_encoding(request, response):
+    """
+    Codificação que compress usaria nesta resposta, ou None (não é 200, é pequena, já vem
+    codificada ou o cliente não aceita).
+    """
+    body = getattr(response, 'body', b'')
+    if response.status_code != 200 or len(body) < COMPRESS_MIN_SIZE or 'content-encoding' in response.headers:
+        return None
+    return accepted_encoding(request)
+
+
+def compress(request, response, cache=False, encoding=None):
+    """
+    Comprime o corpo com br ou gzip se o cliente aceitar e ele passar de COMPRESS_MIN_SIZE.
+    O ETag ganha o sufixo da codificação. Com cache=True o corpo comprimido é guardado pelo
+    ETag, para respostas que se repetem (fixas ou do 'Json/') serem comprimidas uma vez só.
+    """
+    response.headers['Vary'] = 'Accept-Encoding'
+    encoding = encoding or response_encoding(request, response)
+    if not encoding:
+        return response
+    body = response.body
+    tag = response.headers.get('etag')
+    if cache and tag:
+        data = _cached_encode((tag, encoding), body, encoding)
+    else:
+        data = encode(body, encoding)
+    response.body = data
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(data))
+    if tag:
+        response.headers['ETag'] = tag[:-1] + ENCODING_SUFFIX[encoding] + '"'
+    return response
+
+
+def respond(request, response, max_age, swr=0, tag=None, cache=False):
+    """
+    http_cache.conditional + compress. A codificação é escolhida antes da comparação do ETag,
+    para o 304 levar o mesmo ETag (com o sufixo) que o 200 comprimido levaria.
+    """
+    encoding = response_encoding(request, response)
+    result = conditional(request, response, max_age, swr, tag)
+    if result is response:
+        return compress(request, response, cache, encoding)
+    result.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        result.headers['ETag'] = result.headers['etag'][:-1] + ENCODING_SUFFIX[encoding] + '"'
+    return result
@@ -1,8 +1,73 @@
-import requests
-from bs4 import BeautifulSoup
+import http_client
+from parsing import parse
 from urllib.parse import quote, urljoin
 import re
+import os
+import time
+import metrics
+from cache import make_cache
+from stream_cache import cached_resolver
+from parallel import parallel_map
+from singleflight import flight
+from netcine import search_term
 
+# Temporadas/episódios de cada página de série já parseada
+series_cache = make_cache(
+    'gofilmes_series',
+    maxsize=int(os.environ.get("GOFILMES_SERIES_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("GOFILMES_SERIES_CACHE_TTL", str(6 * 3600))),
+)
+SEASON_SELECTORS = ['div.panel', 'div.seasons > div.season', 'div[id^="season-"]']
+_video_src_re = re.compile(r"const videoSrc = '([^']+)'")
+_file_re = re.compile(r'"file"\s*:\s*"([^"]+)"')
+
+def select_panels(soup):
+    for selector in SEASON_SELECTORS:
+        panels = soup.select(selector)
+        if panels:
+            return panels
+    return []
+
+def series_seasons(url, headers):
+    """
+    Devolve os links dos episódios de cada temporada da página da série, em cache por URL.
+    """
+    seasons = series_cache.get(url)
+    metrics.cache_access('gofilmes_series', seasons is not None)
+    if seasons is not None:
+        return seasons
+    start = time.perf_counter()
+    response = http_client.get(url, headers=headers, timeout=10)
+    if response.status_code != 200:
+        return []
+    panels = select_panels(parse(response.text, 'div', class_=['panel', 'seasons', 'season']))
+    if not panels:
+        panels = select_panels(parse(response.text))
+    seasons = [[a['href'] for a in panel.select('div.ep a[href], li a[href]')] for panel in panels]
+    metrics.record('gofilmes_series', time.perf_counter() - start)
+    if seasons:
+        series_cache.set(url, seasons)
+    return seasons
+
+def series_episodes(titles):
+    """
+    Temporadas (listas de links dos episódios) da primeira série dos títulos encontrada no GoFilmes.
+    """
+    for title in titles:
+        if not title or len(title) < 2:
+            continue
+        search_slug = title.replace('.', '').replace(' ', '-').lower()
+        try:
+            seasons = series_seasons(f"https://gofilmess.top/series/{quote(search_slug)}", {'User-Agent': 'Mozilla/5.0'})
+        except Exception as e:
+            metrics.error('gofilmes_series', e)
+            continue
+        if seasons:
+            return seasons
+    return []
+
+@flight(lambda titles, content_type, season=None, episode=None: (tuple(titles), content_type, season, episode))
+@metrics.timed('gofilmes_search')
 def search_gofilmes(titles, content_type, season=None, episode=None):
     """
     Busca por um filme ou série no GoFilmes e retorna o link da página do player.
@@ -16,36 +81,33 @@ def search_gofilmes(titles, content_type, season=None, episode=None):
         url = f"{base_url}/{path}/{quote(search_slug)}" if content_type == 'series' else f"{base_url}/{quote(search_slug)}"
         try:
             headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                if content_type == 'series':
-                    season_selectors = ['div.panel', 'div.seasons > div.season', 'div[id^="season-"]']
-                    panels = []
-                    for selector in season_selectors:
-                        panels = soup.select(selector)
-                        if panels:
-                            break
-                    if not panels: 
-                        continue
-                    if not (season and episode and 0 < season <= len(panels)): 
-                        continue
-                    selected_panel = panels[season - 1]
-                    episode_links = selected_panel.select('div.ep a[href], li a[href]')
-                    if 0 < episode <= len(episode_links):
-                        return [{"name": f"GoFilmes - S{season}E{episode}", "url": urljoin(base_url, episode_links[episode - 1]['href'])}]
-                else:
+            if content_type == 'series':
+                seasons = series_seasons(url, headers)
+                if not seasons:
+                    continue
+                if not (season and episode and 0 < season <= len(seasons)):
+                    continue
+                episode_links = seasons[season - 1]
+                if 0 < episode <= len(episode_links):
+                    return [{"name": f"GoFilmes - S{season}E{episode}", "url": urljoin(base_url, episode_links[episode - 1])}]
+            else:
+                response = http_client.get(url, headers=headers, timeout=10)
+                if response.status_code == 200:
+                    soup = parse(response.text, 'div', class_='link')
                     player_links = soup.select('div.link a[href]')
                     if player_links:
                         return [{"name": f"GoFilmes - {link.get_text(strip=True)}", "url": urljoin(base_url, link['href'])} for link in player_links]
-        except Exception:
-            # Se der erro, simplesmente tenta o próximo título da lista
+        except Exception as e:
+            # Se der erro, registra e tenta o próximo título da lista
+            metrics.error('gofilmes_search', e)
             continue
             
     # Se o loop terminar sem encontrar nada, retorna uma lista vazia
     return []
 
 
+@cached_resolver('gofilmes')
+@metrics.timed('gofilmes_player')
 def resolve_stream(player_url):
     """
     Resolve o stream com múltiplos métodos, agora retornando links do MediaFire para serem tratados no app.py.
@@ -55,18 +117,18 @@ def resolve_stream(player_url):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Referer': 'https://gofilmess.top/'
         }
-        response = requests.get(player_url, headers=headers, timeout=15)
+        response = http_client.get(player_url, headers=headers, timeout=15)
         response.raise_for_status()
         page_html = response.text
 
         # --- MÉTODO 1 (NOVO E PREFERENCIAL) ---
-        match_new = re.search(r"const videoSrc = '([^']+)'", page_html)
+        match_new = _video_src_re.search(page_html)
         if match_new:
             stream_url = match_new.group(1)
             return stream_url, None
 
         # --- MÉTODO 2 (ANTIGO, COMO FALLBACK) ---
-        soup = BeautifulSoup(page_html, 'html.parser')
+        soup = parse(page_html, ['iframe', 'script'])
         headers_for_stremio = headers.copy()
         headers_for_stremio['Referer'] = player_url
 
@@ -78,11 +140,31 @@ def resolve_stream(player_url):
         scripts = soup.find_all('script')
         for script in scripts:
             if script.string:
-                match_old = re.search(r'"file"\s*:\s*"([^"]+)"', script.string)
+                match_old = _file_re.search(script.string)
                 if match_old:
                     stream_url = match_old.group(1)
                     return stream_url, headers_for_stremio
         return None, None
 
-    except Exception:
+    except Exception as e:
+        metrics.error('gofilmes_player', e)
         return None, None
+
+def gofilmes_streams(imdb_id, type, season=None, episode=None):
+    """
+    Streams do GoFilmes de um filme ou episódio, com os títulos do IMDb.
+    """
+    titles, _ = search_term(imdb_id)
+    if not titles: return []
+    streams = []
+    gofilmes_player_options = search_gofilmes(titles, type, season, episode)
+    resolved = parallel_map(resolve_stream, [option['url'] for option in gofilmes_player_options], default=(None, None))
+    for option, (stream_url, stream_headers) in zip(gofilmes_player_options, resolved):
+        if stream_url:
+            stream_name = option['name']
+            if 'mediafire.com' in stream_url: stream_name += " (Só no Navegador)"
+            stream_obj = {"name": stream_name, "url": stream_url}
+            if stream_headers:
+                stream_obj["behaviorHints"] = {"proxyHeaders": {"request": stream_headers}}
+            streams.append(stream_obj)
+    return streams
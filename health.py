@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+
+# Falhas seguidas para abrir o circuito de uma fonte e tempo (s) até testar de novo
+CIRCUIT_FAILURES = int(os.environ.get("CIRCUIT_FAILURES", "3"))
+CIRCUIT_COOLDOWN = float(os.environ.get("CIRCUIT_COOLDOWN", "30"))
+CIRCUIT_MAX_COOLDOWN = float(os.environ.get("CIRCUIT_MAX_COOLDOWN", "300"))
+# Peso da última chamada nas médias móveis de latência e de falhas
+HEALTH_ALPHA = float(os.environ.get("HEALTH_ALPHA", "0.2"))
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+
+class SourceHealth:
+    """
+    Saúde de uma fonte: latência e taxa de falhas recentes (médias móveis) e o circuito.
+    Com o circuito aberto a fonte é pulada; depois do cooldown uma única chamada de teste
+    (meio-aberto) decide se ele fecha ou volta a abrir, com cooldown dobrado.
+    """
+
+    def __init__(self, name, failures=CIRCUIT_FAILURES, cooldown=CIRCUIT_COOLDOWN):
+        self.name = name
+        self.failures = failures
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive = 0
+        self.latency = None
+        self.error_rate = 0.0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self):
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record(self, ok, seconds):
+        self.latency = seconds if self.latency is None else self.latency + HEALTH_ALPHA * (seconds - self.latency)
+        self.error_rate += HEALTH_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+        probe, self.probing = self.probing, False
+        if ok:
+            if self.state != CLOSED:
+                logging.warning(f"Fonte {self.name} voltou; circuito fechado")
+            self.state, self.consecutive, self.cooldown = CLOSED, 0, self.base_cooldown
+            return
+        self.consecutive += 1
+        if probe or (self.state == CLOSED and self.consecutive >= self.failures):
+            if probe:
+                self.cooldown = min(self.cooldown * 2, CIRCUIT_MAX_COOLDOWN)
+            self.state, self.opened_at = OPEN, time.monotonic()
+            logging.warning(f"Fonte {self.name} com {self.consecutive} falhas seguidas; circuito aberto por {self.cooldown:.0f}s")
+
+
+class HealthTracker:
+    """
+    Saúde de cada fonte do /stream, por worker.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self.sources = {}
+
+    def get(self, name):
+        health = self.sources.get(name)
+        if health is None:
+            health = self.sources[name] = SourceHealth(name, **self.options)
+        return health
+
+    def record(self, name, ok, seconds):
+        self.get(name).record(ok, seconds)
+
+    def select(self, sources):
+        """
+        Tira as fontes (nome, ...) com circuito aberto. As demais mantêm a ordem original: elas
+        rodam em paralelo e a ordem é a dos streams na resposta (e do ETag dela).
+        """
+        return [source for source in sources if self.get(source[0]).allow()]
+
+    def states(self):
+        return {name: [CLOSED, HALF_OPEN, OPEN].index(health.state) for name, health in self.sources.items()}
@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+from fastapi import Response
+
+# Cache-Control de cada tipo de resposta (segundos): max-age e stale-while-revalidate
+STATIC_MAX_AGE = int(os.environ.get("STATIC_MAX_AGE", "3600"))
+STATIC_SWR = int(os.environ.get("STATIC_SWR", "86400"))
+CATALOG_MAX_AGE = int(os.environ.get("CATALOG_MAX_AGE", "3600"))
+CATALOG_SWR = int(os.environ.get("CATALOG_SWR", "86400"))
+# Streams só do 'Json/' mudam pouco; os raspados expiram junto com os links (ver stream_cache.stream_ttl)
+STREAM_LOCAL_MAX_AGE = int(os.environ.get("STREAM_LOCAL_MAX_AGE", "86400"))
+STREAM_LOCAL_SWR = int(os.environ.get("STREAM_LOCAL_SWR", "604800"))
+STREAM_MAX_AGE = int(os.environ.get("STREAM_MAX_AGE", "600"))
+STREAM_SWR = int(os.environ.get("STREAM_SWR", "300"))
+# Resposta vazia: cache curto, para uma falha passageira não ficar presa na CDN
+STREAM_EMPTY_MAX_AGE = int(os.environ.get("STREAM_EMPTY_MAX_AGE", "60"))
+
+
+def cache_control(max_age, swr=0):
+    value = f"public, max-age={int(max_age)}"
+    if swr:
+        value += f", stale-while-revalidate={int(swr)}"
+    return value
+
+
+def etag(body):
+    return '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def not_modified(request, tag):
+    """
+    True se o If-None-Match do cliente já tem esta versão.
+    """
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [_base_tag(t.strip()) for t in header.split(',')]
+    return '*' in tags or tag in tags
+
+
+def _base_tag(tag):
+    # Tira o prefixo de ETag fraco e o sufixo da codificação (ver encoding.compress)
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    for suffix in ('-br"', '-gz"'):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def conditional(request, response, max_age, swr=0, tag=None):
+    """
+    Põe ETag e Cache-Control na resposta; se o cliente já tem a mesma versão, devolve um 304 vazio.
+    'tag' pode vir pré-calculado para corpos fixos.
+    """
+    tag = tag or etag(response.body)
+    headers = {'ETag': tag, 'Cache-Control': cache_control(max_age, swr)}
+    if not_modified(request, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
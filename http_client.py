@@ -0,0 +1,245 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlparse
+
+import metrics
+
+# Timeouts padrão (conexão, leitura) em segundos para qualquer chamada sem timeout explícito
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+NETCINE_COOKIE = 'XCRF%3DXCRF'
+# Manda todas as chamadas para um servidor local (benchmarks/mock_server.py) em vez da internet:
+# https://host/caminho vira {UPSTREAM_OVERRIDE}/host/caminho
+UPSTREAM_OVERRIDE = os.environ.get("HTTP_UPSTREAM_OVERRIDE", "").rstrip('/')
+
+# Cabeçalhos e cookies por host; vale para o domínio e todos os subdomínios
+HOST_CONFIG = {
+    'imdb.com': {'headers': {'Accept-Language': 'pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3'}},
+    'netcinez.si': {'headers': {'Cookie': NETCINE_COOKIE}},
+    'gofilmess.top': {'headers': {'Referer': 'https://gofilmess.top/'}},
+}
+
+# Limite de chamadas simultâneas e por segundo em cada host (0 = sem limite de taxa), por worker.
+# HTTP_HOST_LIMITS ajusta hosts específicos: "imdb.com=16:30,gofilmess.top=4:5"
+HOST_CONCURRENCY = int(os.environ.get("HTTP_HOST_CONCURRENCY", "8"))
+HOST_RPS = float(os.environ.get("HTTP_HOST_RPS", "10"))
+
+
+def parse_host_limits(value):
+    """
+    "host=conc:rps,host=conc" -> {host: (conc, rps)}; sem ':rps' vale HOST_RPS. Itens inválidos
+    são ignorados (com aviso no log) para um erro de configuração não derrubar o app.
+    """
+    limits = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        host, _, spec = item.partition('=')
+        concurrency, _, rps = spec.partition(':')
+        try:
+            if not host.strip():
+                raise ValueError(item)
+            limits[host.strip()] = (int(concurrency), float(rps) if rps.strip() else HOST_RPS)
+        except ValueError:
+            logging.warning(f"HTTP_HOST_LIMITS: item inválido ignorado: {item!r}")
+    return limits
+
+
+HOST_LIMITS = parse_host_limits(os.environ.get("HTTP_HOST_LIMITS", ""))
+# Espera máxima na fila de um host antes de desistir da chamada
+QUEUE_TIMEOUT = float(os.environ.get("HTTP_QUEUE_TIMEOUT", "10"))
+
+_sessions = {}
+_limiters = {}
+_lock = threading.Lock()
+# Fluxo (requisição do addon, pré-busca...) dono das chamadas feitas neste contexto
+_flow = contextvars.ContextVar('flow', default=None)
+
+
+class QueueTimeout(TimeoutError):
+    pass
+
+
+class HostLimiter:
+    """
+    No máximo 'concurrency' chamadas simultâneas e 'rps' por segundo (com rajada de até
+    'rps' chamadas) para um host. Quem espera é atendido em rodízio entre os fluxos e na
+    ordem de chegada dentro de cada fluxo, para uma requisição grande não travar as outras.
+    """
+
+    def __init__(self, concurrency, rps):
+        self.concurrency = max(concurrency, 1)
+        self.interval = 1 / rps if rps > 0 else 0
+        self.burst = self.interval * max(rps, 1)
+        self.active = 0
+        self.flows = OrderedDict()
+        self.tat = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, flow, timeout=QUEUE_TIMEOUT):
+        waiter = None
+        with self.lock:
+            if self.active < self.concurrency and not self.flows:
+                self.active += 1
+            else:
+                waiter = threading.Event()
+                self.flows.setdefault(flow, deque()).append(waiter)
+        if waiter and not waiter.wait(timeout):
+            with self.lock:
+                if not waiter.is_set():
+                    waiters = self.flows.get(flow)
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self.flows[flow]
+                    raise QueueTimeout(f"Fila do host excedeu {timeout}s")
+        if self.interval:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.tat - self.burst)
+                self.tat = max(self.tat, start) + self.interval
+            if start > now:
+                time.sleep(start - now)
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+            while self.active < self.concurrency and self.flows:
+                flow, waiters = next(iter(self.flows.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    self.flows.move_to_end(flow)
+                else:
+                    del self.flows[flow]
+                self.active += 1
+                waiter.set()
+
+    def waiting(self):
+        return sum(len(waiters) for waiters in self.flows.values())
+
+
+def set_flow(flow):
+    """
+    Marca as chamadas deste contexto (e das threads que recebem uma cópia dele) como do fluxo 'flow'.
+    """
+    _flow.set(flow)
+
+
+def limiter_for(host):
+    limiter = _limiters.get(host)
+    if limiter:
+        return limiter
+    with _lock:
+        limiter = _limiters.get(host)
+        if not limiter:
+            concurrency, rps = HOST_CONCURRENCY, HOST_RPS
+            for domain, limits in HOST_LIMITS.items():
+                if host == domain or host.endswith('.' + domain):
+                    concurrency, rps = limits
+            limiter = _limiters[host] = HostLimiter(concurrency, rps)
+    return limiter
+
+
+metrics.gauge('fenixsky_upstream_queue_waiting', lambda: {host: l.waiting() for host, l in list(_limiters.items())}, label='host')
+metrics.gauge('fenixsky_upstream_active', lambda: {host: l.active for host, l in list(_limiters.items())}, label='host')
+
+
+def configure_host(host, headers=None, cookies=None):
+    """
+    Registra cabeçalhos/cookies padrão para um host (ex.: o mirror atual do netcine).
+    """
+    host = urlparse(host).hostname or host
+    with _lock:
+        config = HOST_CONFIG.setdefault(host, {})
+        new_headers = dict(config.get('headers', {}), **(headers or {}))
+        new_cookies = dict(config.get('cookies', {}), **(cookies or {}))
+        if new_headers == config.get('headers', {}) and new_cookies == config.get('cookies', {}):
+            return
+        config['headers'], config['cookies'] = new_headers, new_cookies
+        # A sessão é recriada na próxima chamada com a nova configuração
+        session = _sessions.pop(host, None)
+    if session:
+        session.close()
+
+
+def _host_config(host):
+    headers, cookies = {}, {}
+    for domain, config in HOST_CONFIG.items():
+        if host == domain or host.endswith('.' + domain):
+            headers.update(config.get('headers', {}))
+            cookies.update(config.get('cookies', {}))
+    return headers, cookies
+
+
+def session_for(url):
+    """
+    Devolve a Session keep-alive do host da URL, criando-a na primeira vez.
+    """
+    host = urlparse(url).hostname or ''
+    session = _sessions.get(host)
+    if session:
+        return session
+    with _lock:
+        session = _sessions.get(host)
+        if not session:
+            # requests só é importado na primeira chamada (ver FAST_START no app.py)
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            headers, cookies = _host_config(host)
+            session.headers.update({'User-Agent': USER_AGENT})
+            session.headers.update(headers)
+            for name, value in cookies.items():
+                session.cookies.set(name, value, domain=host)
+            _sessions[host] = session
+    return session
+
+
+def _route(url):
+    parsed = urlparse(url)
+    return f"{UPSTREAM_OVERRIDE}/{parsed.netloc}{parsed.path or '/'}" + (f"?{parsed.query}" if parsed.query else '')
+
+
+def _unroute(url):
+    if url.startswith(UPSTREAM_OVERRIDE + '/'):
+        return 'https://' + url[len(UPSTREAM_OVERRIDE) + 1:]
+    return url
+
+
+def get(url, headers=None, timeout=None, **kwargs):
+    """
+    GET pela sessão do host, respeitando o limite de chamadas do host (ver HostLimiter).
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    host = urlparse(url).hostname or ''
+    limiter = limiter_for(host)
+    start = time.perf_counter()
+    try:
+        limiter.acquire(_flow.get())
+    except QueueTimeout:
+        metrics.queued(host, time.perf_counter() - start, timed_out=True)
+        raise
+    metrics.queued(host, time.perf_counter() - start)
+    start = time.perf_counter()
+    try:
+        if UPSTREAM_OVERRIDE:
+            response = session_for(url).get(_route(url), headers=headers, timeout=timeout, **kwargs)
+            response.url = _unroute(response.url)
+        else:
+            response = session_for(url).get(url, headers=headers, timeout=timeout, **kwargs)
+    except Exception as e:
+        metrics.upstream(host, time.perf_counter() - start, type(e).__name__)
+        raise
+    finally:
+        limiter.release()
+    metrics.upstream(host, time.perf_counter() - start, response.status_code)
+    return response
@@ -0,0 +1,330 @@
+"""
+Pré-resolve filmes e séries com os scrapers (netcine e GoFilmes) e grava os streams em
+'Json/<imdb>.json', no mesmo formato dos arquivos mantidos à mão, para o /stream servir
+esses títulos localmente.
+
+O progresso fica em INGEST_STATE (ingest_state.json): uma execução interrompida continua de
+onde parou, e execuções seguintes só refazem episódios que faltam ou com mais de --max-age.
+O /stream lê o mesmo arquivo para saber se um episódio ingerido ainda está em dia. Links
+assinados (que expiram em minutos) não são gravados.
+
+Uso: python ingest.py [tt0386676 tt15398776:movie ...] [--file ids.txt] [--search "Oppenheimer"]
+         [--season 1] [--workers 4] [--max-age 604800] [--force] [--compile]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gofilmes import gofilmes_streams, series_episodes
+from local_store import parse_entries, compile_catalog, COMPILED_PATH, SCRAPED_PREFIXES, INGEST_MAX_AGE, INGEST_STATE
+from netcine import catalog_search, search_link, search_term, show_episodes
+from stream_cache import is_signed
+
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "4"))
+# Episódios resolvidos de um título antes de gravar o arquivo e o progresso
+FLUSH_EVERY = 10
+
+
+def write_json(path, data, **kwargs):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def merge_streams(old, new):
+    urls = {item.get('url') for item in new}
+    kept = [item for item in old if not str(item.get('name', '')).startswith(SCRAPED_PREFIXES) and item.get('url') not in urls]
+    return kept + new
+
+
+def file_type(data):
+    """
+    'series' se o conteúdo de 'Json/<imdb>.json' tem episódios, 'movie' se tem streams soltos,
+    ou None (arquivo vazio ou inexistente).
+    """
+    streams = (data or {}).get('streams') or []
+    if any(isinstance(item, dict) and 'temporada' in item and 'episodio' in item for item in streams):
+        return 'series'
+    return 'movie' if streams else None
+
+
+def title_type(imdb_id, data=None):
+    """
+    'movie' ou 'series' pelo formato do arquivo existente ou, sem ele, pelo tipo do título no
+    IMDb (sugestões, o mesmo 'qid' do catálogo); None se não der para saber.
+    """
+    content_type = file_type(data)
+    if content_type:
+        return content_type
+    for item in catalog_search(imdb_id):
+        if item['id'] == imdb_id:
+            return 'series' if 'series' in item['type'].lower() else 'movie'
+    return None
+
+
+def merge_title(data, imdb_id, content_type, results):
+    """
+    Junta os streams resolvidos {(temporada, episódio): streams} ao conteúdo de 'Json/<imdb>.json'.
+    Streams de filme nunca entram num arquivo com episódios, nem episódios num arquivo de filme.
+    """
+    existing = file_type(data)
+    if existing and existing != content_type:
+        raise ValueError(f"{imdb_id}: o arquivo é de {existing}, não de {content_type}")
+    data = data or {"id": imdb_id, "type": content_type, "streams": []}
+    if content_type == 'movie':
+        data['streams'] = merge_streams(data.get('streams', []), results.get((None, None), []))
+        return data
+    episodes = {(item.get('temporada'), item.get('episodio')): item for item in data.get('streams', [])
+                if isinstance(item, dict) and 'temporada' in item and 'episodio' in item}
+    for (season, episode), streams in results.items():
+        item = episodes.setdefault((season, episode), {"temporada": season, "episodio": episode, "streams": []})
+        item['streams'] = merge_streams(item['streams'], streams)
+    data['streams'] = [episodes[key] for key in sorted(episodes)]
+    return data
+
+
+class Ingest:
+    def __init__(self, directory="Json", state_path=INGEST_STATE, max_age=INGEST_MAX_AGE, workers=INGEST_WORKERS, force=False):
+        self.directory = directory
+        self.state_path = state_path
+        self.max_age = max_age
+        self.workers = workers
+        self.force = force
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {}
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.remaining = {}
+        self.stats = {"titles": 0, "tasks": 0, "skipped": 0, "resolved": 0, "found": 0, "streams": 0, "signed": 0, "errors": 0}
+        self.timings = []
+
+    def _path(self, imdb_id):
+        return os.path.join(self.directory, f"{imdb_id}.json")
+
+    def _load(self, imdb_id):
+        try:
+            with open(self._path(imdb_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def needed(self, key, has_streams):
+        """
+        Episódio sem streams e ainda não tentado, ou tentado há mais de max_age.
+        Episódios mantidos à mão (com streams e sem registro no progresso) ficam como estão.
+        """
+        if self.force:
+            return True
+        entry = self.state.get(key)
+        if entry is None:
+            return not has_streams
+        return time.time() - entry['at'] > self.max_age
+
+    def plan(self, imdb_id, content_type='auto', seasons=None):
+        """
+        Lista as tarefas (imdb, tipo, temporada, episódio) de um título que precisam ser resolvidas.
+        """
+        data = self._load(imdb_id)
+        if content_type == 'auto':
+            # Não dá para deduzir pelo netcine: série que só o GoFilmes tem viraria filme
+            content_type = title_type(imdb_id, data)
+            if not content_type:
+                raise ValueError(f"tipo de {imdb_id} desconhecido; use {imdb_id}:movie ou {imdb_id}:series")
+        elif file_type(data) not in (None, content_type):
+            raise ValueError(f"{imdb_id}: o arquivo é de {file_type(data)}, não de {content_type}")
+        show = show_episodes(imdb_id) if content_type == 'series' else None
+        existing = parse_entries(imdb_id, data) if data else {}
+        if content_type == 'movie':
+            if self.needed(imdb_id, bool(existing.get((imdb_id, None, None)))):
+                return [(imdb_id, 'movie', None, None)]
+            self._skip(1)
+            return []
+
+        counts = [len(episodes) for episodes in (show or {}).get('seasons', [])]
+        titles, _ = search_term(imdb_id)
+        for number, episodes in enumerate(series_episodes(titles) if titles else []):
+            if number < len(counts):
+                counts[number] = max(counts[number], len(episodes))
+            else:
+                counts.append(len(episodes))
+        tasks = []
+        for season, count in enumerate(counts, 1):
+            if seasons and season not in seasons:
+                continue
+            for episode in range(1, count + 1):
+                if self.needed(f"{imdb_id}:{season}:{episode}", bool(existing.get((imdb_id, season, episode)))):
+                    tasks.append((imdb_id, 'series', season, episode))
+        self._skip(sum(count for season, count in enumerate(counts, 1) if not seasons or season in seasons) - len(tasks))
+        return tasks
+
+    def _skip(self, count):
+        with self.lock:
+            self.stats["skipped"] += count
+
+    def resolve(self, imdb_id, content_type, season, episode):
+        """
+        Streams do filme ou episódio nos scrapers, sem os links assinados: eles expiram em
+        minutos (SIGNED_STREAM_TTL) e o /stream busca esses títulos na hora.
+        """
+        stream_id = imdb_id if content_type == 'movie' else f"{imdb_id}:{season}:{episode}"
+        streams = search_link(stream_id) + gofilmes_streams(imdb_id, content_type, season, episode)
+        kept = [stream for stream in streams if not is_signed(stream)]
+        with self.lock:
+            self.stats["signed"] += len(streams) - len(kept)
+        return kept
+
+    def _record(self, task, streams, seconds):
+        imdb_id, content_type, season, episode = task
+        key = imdb_id if content_type == 'movie' else f"{imdb_id}:{season}:{episode}"
+        with self.lock:
+            self.timings.append(seconds)
+            self.stats["resolved"] += 1
+            if streams:
+                # O progresso só é marcado depois que o arquivo for gravado (ver _flush)
+                self.stats["found"] += 1
+                self.stats["streams"] += len(streams)
+                self.pending.setdefault((imdb_id, content_type), {})[(season, episode)] = streams
+            else:
+                self.state[key] = {"at": time.time(), "found": 0}
+            self.remaining[imdb_id] -= 1
+            buffered = len(self.pending.get((imdb_id, content_type), {}))
+            if buffered >= FLUSH_EVERY or (self.remaining[imdb_id] == 0 and buffered):
+                self._flush(imdb_id, content_type)
+            elif self.remaining[imdb_id] == 0:
+                self._save_state()
+
+    def _flush(self, imdb_id, content_type):
+        results = self.pending.pop((imdb_id, content_type), None)
+        if results:
+            try:
+                data = merge_title(self._load(imdb_id), imdb_id, content_type, results)
+            except ValueError as e:
+                # Progresso não é marcado: o item volta na próxima execução com o tipo certo
+                self.stats["errors"] += 1
+                logging.error(f"Streams de {imdb_id} descartados: {e}")
+                self._save_state()
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            write_json(self._path(imdb_id), data, indent=2)
+            now = time.time()
+            for (season, episode), streams in results.items():
+                key = imdb_id if content_type == 'movie' else f"{imdb_id}:{season}:{episode}"
+                self.state[key] = {"at": now, "found": len(streams)}
+        self._save_state()
+
+    def _save_state(self):
+        write_json(self.state_path, self.state)
+
+    def run(self, items, seasons=None):
+        """
+        items: lista de (imdb_id, tipo) com tipo 'movie', 'series' ou 'auto'.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as pool:
+            tasks = []
+            plans = {pool.submit(self.plan, imdb_id, content_type, seasons): imdb_id for imdb_id, content_type in dict.fromkeys(items)}
+            for future in as_completed(plans):
+                self.stats["titles"] += 1
+                try:
+                    title_tasks = future.result()
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logging.error(f"Erro ao listar {plans[future]}: {e}")
+                    continue
+                self.remaining[plans[future]] = len(title_tasks)
+                tasks.extend(title_tasks)
+            self.stats["tasks"] = len(tasks)
+
+            def timed_resolve(task):
+                task_start = time.perf_counter()
+                return self.resolve(*task), time.perf_counter() - task_start
+
+            futures = {pool.submit(timed_resolve, task): task for task in tasks}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        streams, seconds = future.result()
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logging.error(f"Erro ao resolver {futures[future]}: {e}")
+                        with self.lock:
+                            self.remaining[futures[future][0]] -= 1
+                        continue
+                    self._record(futures[future], streams, seconds)
+            finally:
+                for future in futures:
+                    future.cancel()
+                with self.lock:
+                    for imdb_id, content_type in list(self.pending):
+                        self._flush(imdb_id, content_type)
+                    self._save_state()
+        self.elapsed = time.perf_counter() - start
+        return self.stats
+
+    def report(self):
+        stats = self.stats
+        lines = [
+            f"{stats['titles']} títulos, {stats['tasks']} episódios/filmes a resolver, {stats['skipped']} em dia, {stats['errors']} erros",
+            f"{stats['resolved']} resolvidos, {stats['found']} com streams ({stats['streams']} streams, "
+            f"{stats['signed']} links assinados ignorados) em {self.elapsed:.1f}s",
+        ]
+        if self.timings:
+            timings = sorted(self.timings)
+            lines.append(f"{stats['resolved'] / self.elapsed:.2f} itens/s, {stats['streams'] / self.elapsed:.2f} streams/s, "
+                         f"p50 {statistics.median(timings):.2f}s, p95 {timings[min(int(len(timings) * 0.95), len(timings) - 1)]:.2f}s por item")
+        return '\n'.join(lines)
+
+
+def parse_item(text):
+    imdb_id, _, content_type = text.strip().partition(':')
+    return imdb_id, content_type or 'auto'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('ids', nargs='*', help="tt1234567, tt1234567:movie ou tt1234567:series")
+    parser.add_argument('--file', help="arquivo com um id por linha")
+    parser.add_argument('--search', action='append', default=[], help="busca no catálogo (IMDb) e ingere os resultados")
+    parser.add_argument('--season', type=int, action='append', help="só estas temporadas")
+    parser.add_argument('--dir', default="Json")
+    parser.add_argument('--state', default=INGEST_STATE)
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS)
+    parser.add_argument('--max-age', type=float, default=INGEST_MAX_AGE, help="segundos até um episódio ser resolvido de novo")
+    parser.add_argument('--force', action='store_true', help="resolve tudo de novo")
+    parser.add_argument('--compile', action='store_true', help="recompila o catálogo SQLite no final")
+    args = parser.parse_args()
+
+    items = [parse_item(text) for text in args.ids]
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            items += [parse_item(line) for line in f if line.strip() and not line.startswith('#')]
+    if args.search:
+        for query in args.search:
+            items += [(item['id'], item['type']) for item in catalog_search(query) if item.get('type') in ('movie', 'series')]
+    if not items:
+        parser.error("nenhum título informado")
+
+    ingest = Ingest(args.dir, args.state, args.max_age, args.workers, args.force)
+    try:
+        ingest.run(items, set(args.season or []))
+    except KeyboardInterrupt:
+        print("interrompido; o progresso foi salvo")
+        return 1
+    print(ingest.report())
+    if args.compile:
+        print(f"{compile_catalog(args.dir, COMPILED_PATH)} títulos compilados em {COMPILED_PATH}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
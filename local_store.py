@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+COMPILED_PATH = os.environ.get("LOCAL_STORE_DB", "catalog.db")
+# Streams com esses nomes vieram dos scrapers pelo ingest.py; os demais (ex.: 'Topflix - Player')
+# são mantidos à mão
+SCRAPED_PREFIXES = ('Netcine', 'GoFilmes')
+# Idade máxima de um item ingerido para o /stream dispensar os scrapers (e do ingest.py refazer o item)
+INGEST_MAX_AGE = float(os.environ.get("INGEST_MAX_AGE", str(7 * 24 * 3600)))
+# Progresso do ingest.py: {imdb ou imdb:temporada:episódio: {'at': quando foi resolvido, 'found': streams}}
+INGEST_STATE = os.environ.get("INGEST_STATE", "ingest_state.json")
+
+
+def parse_entries(imdb_id, local_data):
+    """
+    Converte o conteúdo de 'Json/<imdb>.json' em {(imdb_id, temporada, episódio): streams}.
+    Filmes usam a chave (imdb_id, None, None).
+    """
+    entries = {}
+    if local_data.get('id') != imdb_id:
+        return entries
+    streams = local_data.get('streams', [])
+    for item in streams:
+        if isinstance(item, dict) and 'temporada' in item and 'episodio' in item:
+            entries.setdefault((imdb_id, item.get('temporada'), item.get('episodio')), item.get('streams', []))
+    if not entries:
+        entries[(imdb_id, None, None)] = streams
+    return entries
+
+
+def read_entries(path):
+    imdb_id = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_entries(imdb_id, json.load(f))
+
+
+def compile_catalog(directory="Json", db_path=COMPILED_PATH):
+    """
+    Compila 'Json/*.json' num único arquivo SQLite somente-leitura, compartilhado pelos workers.
+    Retorna o número de títulos compilados.
+    """
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("CREATE TABLE files (imdb_id TEXT PRIMARY KEY, mtime REAL NOT NULL) WITHOUT ROWID")
+    conn.execute("CREATE TABLE streams (imdb_id TEXT NOT NULL, season INTEGER NOT NULL, episode INTEGER NOT NULL, "
+                 "streams TEXT NOT NULL, PRIMARY KEY (imdb_id, season, episode)) WITHOUT ROWID")
+    count = 0
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not (entry.name.endswith('.json') and entry.is_file()):
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+            entries = read_entries(entry.path)
+        except Exception as e:
+            logging.error(f"Erro ao ler JSON de {entry.path}: {e}")
+            continue
+        imdb_id = os.path.splitext(entry.name)[0]
+        conn.execute("INSERT INTO files VALUES (?, ?)", (imdb_id, mtime))
+        conn.executemany("INSERT INTO streams VALUES (?, ?, ?, ?)", [
+            (imdb, season or 0, episode or 0, json.dumps(streams, ensure_ascii=False, separators=(',', ':')))
+            for (imdb, season, episode), streams in entries.items()
+        ])
+        count += 1
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return count
+
+
+class CompiledStore:
+    """
+    Leitura do catálogo compilado por compile_catalog(), via SQLite com mmap.
+    Cada thread usa a sua própria conexão somente-leitura.
+    """
+
+    def __init__(self, db_path=COMPILED_PATH, mmap_size=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self.mtimes = dict(self._conn().execute("SELECT imdb_id, mtime FROM files"))
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            uri = 'file:%s?mode=ro' % os.path.abspath(self.db_path)
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute("PRAGMA mmap_size=%d" % self.mmap_size)
+            self._local.conn = conn
+        return conn
+
+    def get(self, imdb_id, season=None, episode=None):
+        row = self._conn().execute("SELECT streams FROM streams WHERE imdb_id=? AND season=? AND episode=?",
+                                   (imdb_id, season or 0, episode or 0)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+class LocalStore:
+    """
+    Índice dos arquivos 'Json/<imdb>.json', com chave (imdb_id, temporada, episódio).
+    Arquivos novos ou alterados são detectados pelo mtime e só eles são recarregados, em segundo plano.
+    Se houver catálogo compilado, os títulos dele ficam fora da memória e só os arquivos
+    JSON mais novos que o catálogo são carregados no índice.
+    Com lazy=True nada é lido até a primeira consulta. O progresso do ingest.py ('state_path')
+    é relido junto com os arquivos, quando muda, e dá a idade de cada filme ou episódio ingerido.
+    """
+
+    def __init__(self, directory="Json", reload_interval=30, compiled=None, lazy=False, state_path=None):
+        self.directory = directory
+        self.state_path = state_path
+        self._state = {}
+        self._state_mtime = None
+        self.reload_interval = reload_interval
+        self.compiled_path = compiled
+        self.compiled = None
+        self._compiled_ids = set()
+        self._index = {}
+        self._keys_by_file = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._refreshing = False
+        self._last_check = 0
+        if not lazy:
+            self.load()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self):
+        """
+        Abre o catálogo compilado e monta o índice, uma vez só.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self.compiled_path and os.path.exists(self.compiled_path):
+                try:
+                    self.compiled = CompiledStore(self.compiled_path)
+                except sqlite3.Error as e:
+                    logging.error(f"Erro ao abrir catálogo compilado {self.compiled_path}: {e}")
+            self.refresh()
+            self._loaded = True
+
+    def refresh(self):
+        """
+        Recarrega os arquivos cujo mtime mudou e remove do índice os que foram apagados.
+        """
+        try:
+            entries = {entry.path: entry.stat().st_mtime for entry in os.scandir(self.directory)
+                       if entry.name.endswith('.json') and entry.is_file()}
+            missing_dir = False
+        except FileNotFoundError:
+            entries, missing_dir = {}, True
+        compiled_ids = set()
+        if self.compiled:
+            if missing_dir:
+                compiled_ids = set(self.compiled.mtimes)
+            for path, mtime in list(entries.items()):
+                imdb_id = os.path.splitext(os.path.basename(path))[0]
+                if mtime <= self.compiled.mtimes.get(imdb_id, -1):
+                    compiled_ids.add(imdb_id)
+                    del entries[path]
+        for path in set(self._mtimes) - set(entries):
+            self._drop(path)
+        for path, mtime in entries.items():
+            if self._mtimes.get(path) != mtime:
+                self._load(path, mtime)
+        self._compiled_ids = compiled_ids
+        self._refresh_state()
+        self._last_check = time.monotonic()
+
+    def _refresh_state(self):
+        if not self.state_path:
+            return
+        try:
+            mtime = os.stat(self.state_path).st_mtime
+        except FileNotFoundError:
+            self._state, self._state_mtime = {}, None
+            return
+        if mtime == self._state_mtime:
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            logging.error(f"Erro ao ler o progresso do ingest {self.state_path}: {e}")
+            return
+        self._state, self._state_mtime = state, mtime
+
+    def _drop(self, path):
+        with self._lock:
+            for key in self._keys_by_file.pop(path, ()):
+                self._index.pop(key, None)
+            self._mtimes.pop(path, None)
+
+    def _load(self, path, mtime):
+        try:
+            entries = read_entries(path)
+        except Exception as e:
+            logging.error(f"Erro ao ler JSON de {path}: {e}")
+            return
+        with self._lock:
+            for key in self._keys_by_file.pop(path, ()):
+                self._index.pop(key, None)
+            self._index.update(entries)
+            self._keys_by_file[path] = set(entries)
+            self._mtimes[path] = mtime
+
+    def _maybe_refresh(self):
+        if self._refreshing or time.monotonic() - self._last_check < self.reload_interval:
+            return
+        self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"Erro ao atualizar índice de {self.directory}: {e}")
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def _get(self, imdb_id, season=None, episode=None):
+        streams = self._index.get((imdb_id, season, episode))
+        if streams is None and imdb_id in self._compiled_ids:
+            streams = self.compiled.get(imdb_id, season, episode)
+        return streams or []
+
+    def age(self, imdb_id, season=None, episode=None):
+        """
+        Segundos desde que o ingest.py resolveu o filme ou episódio, ou None se não há registro.
+        """
+        entry = self._state.get(imdb_id if season is None else f"{imdb_id}:{season}:{episode}")
+        return None if entry is None else time.time() - entry['at']
+
+    def lookup(self, imdb_id, content_type, season=None, episode=None):
+        """
+        Devolve os streams locais de um filme ou episódio, ou [] se não houver.
+        """
+        self.load()
+        self._maybe_refresh()
+        if content_type == 'series':
+            if not (season and episode):
+                return []
+            return self._get(imdb_id, season, episode)
+        if content_type == 'movie':
+            return self._get(imdb_id)
+        return []
+
+
+if __name__ == '__main__':
+    # Uso: python local_store.py [pasta_json] [arquivo_db]
+    directory = sys.argv[1] if len(sys.argv) > 1 else "Json"
+    db_path = sys.argv[2] if len(sys.argv) > 2 else COMPILED_PATH
+    start = time.perf_counter()
+    count = compile_catalog(directory, db_path)
+    print(f"{count} títulos compilados em {db_path} ({time.perf_counter() - start:.2f}s)")
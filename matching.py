@@ -0,0 +1,96 @@
+import re
+import unicodedata
+
+# Diferença de ano aceita entre o IMDb e o site, e pontuação mínima para aceitar um resultado
+YEAR_TOLERANCE = 1
+YEAR_PENALTY = 15
+MIN_SCORE = 30
+
+_year_re = re.compile(r'\d{4}')
+_punct_re = re.compile(r'[^\w\s]')
+_subtitle_re = re.compile(r'\s*(?::|\s[–-])\s+')
+
+
+def normalize(text):
+    """
+    Minúsculas, sem acentos e sem pontuação; '&' vira 'e'.
+    """
+    text = unicodedata.normalize('NFKD', text.replace('&amp;', '&'))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = _punct_re.sub(' ', text.replace('&', ' e '))
+    return ' '.join(text.split())
+
+
+def title_keys(title):
+    """
+    Chaves de comparação de um título: completo e subtítulo (depois de ':' ou ' – ').
+    """
+    parts = _subtitle_re.split(title.strip(), maxsplit=1)
+    return (normalize(title), normalize(parts[1]) if len(parts) > 1 else '')
+
+
+def parse_year(year):
+    match = _year_re.search(str(year or ''))
+    return int(match.group()) if match else None
+
+
+def _contains(haystack, needle):
+    # Títulos muito curtos ('it', 'up') casariam com qualquer coisa
+    return len(needle) >= 3 and f' {needle} ' in f' {haystack} '
+
+
+def _title_score(query, candidate):
+    full, sub = query
+    c_full, c_sub = candidate
+    if not full or not c_full:
+        return 0
+    if full == c_full:
+        return 100
+    # Palavras a mais num dos lados pesam contra (ex.: 'the office' x 'the office uk')
+    extra = abs(len(full.split()) - len(c_full.split()))
+    if _contains(c_full, full) or _contains(full, c_full):
+        return max(70 - 5 * extra, 40)
+    if sub and c_sub and sub == c_sub:
+        return 60
+    if sub and (_contains(c_full, sub) or _contains(sub, c_full)) and len(sub.split()) > 1:
+        return 45
+    if c_sub and _contains(full, c_sub) and len(c_sub.split()) > 1:
+        return 45
+    return 0
+
+
+class Query:
+    """
+    Título do IMDb normalizado uma vez (nome e nomes alternativos) e ano de lançamento.
+    """
+
+    def __init__(self, titles, year):
+        self.keys = [title_keys(title) for title in dict.fromkeys(t for t in titles if t)]
+        self.year = parse_year(year)
+
+    def score(self, name, year):
+        candidate_year = parse_year(year)
+        if self.year is None or candidate_year is None:
+            return 0
+        diff = abs(candidate_year - self.year)
+        if diff > YEAR_TOLERANCE:
+            return 0
+        candidate = title_keys(name)
+        best = max((_title_score(keys, candidate) for keys in self.keys), default=0)
+        return best - diff * YEAR_PENALTY if best else 0
+
+
+def best_match(query, candidates, kind):
+    """
+    Pontua todos os resultados (nome, ano, link) numa passada e devolve o link do melhor,
+    ou '' se nenhum passar de MIN_SCORE. Em empate vale o primeiro da página.
+    kind: 'tvshows' só aceita links de séries, 'movies' só de filmes.
+    """
+    best_link, best_score = '', MIN_SCORE - 1
+    for name, year, link in candidates:
+        if not link or (('/tvshows/' in link) != (kind == 'tvshows')):
+            continue
+        score = query.score(name, year)
+        if score > best_score:
+            best_link, best_score = link, score
+    return best_link
@@ -0,0 +1,227 @@
+import bisect
+import contextvars
+import functools
+import logging
+import threading
+import time
+
+# Limites (segundos) dos histogramas de latência
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_gauges = {}
+# Tempos da requisição atual, para o cabeçalho Server-Timing
+_timings = contextvars.ContextVar('timings', default=None)
+# Falhas registradas na chamada atual de uma fonte, mesmo as que ela trata e transforma em []
+_failures = contextvars.ContextVar('failures', default=None)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, seconds, **labels):
+    with _lock:
+        histogram = _histograms.get(_key(name, labels))
+        if histogram is None:
+            histogram = _histograms[_key(name, labels)] = Histogram()
+        histogram.observe(seconds)
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name, func, label=None):
+    """
+    Registra um valor lido na hora do /metrics: func() devolve um número, ou um dict
+    {valor do label: número} quando 'label' é informado.
+    """
+    _gauges[name] = (func, label)
+
+
+def record(stage, seconds):
+    """
+    Registra a duração de uma etapa no histograma e no Server-Timing da requisição atual.
+    """
+    observe('fenixsky_stage_seconds', seconds, stage=stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def failed(stage):
+    """
+    Marca uma falha da etapa na lista de track_failures() do contexto atual, se houver.
+    """
+    failures = _failures.get()
+    if failures is not None:
+        failures.append(stage)
+
+
+def track_failures():
+    """
+    Começa a coletar as falhas do contexto atual; devolve a lista que será preenchida.
+    """
+    failures = []
+    _failures.set(failures)
+    return failures
+
+
+def error(stage, exc):
+    """
+    Conta e registra no log uma falha tratada numa etapa.
+    """
+    inc('fenixsky_stage_errors_total', stage=stage, error=type(exc).__name__)
+    failed(stage)
+    logging.warning(f"Erro em {stage}: {exc}")
+
+
+def timed(stage):
+    """
+    Decorator: mede cada chamada da função como a etapa 'stage'. Exceções são contadas e repassadas.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                inc('fenixsky_stage_errors_total', stage=stage, error=type(e).__name__)
+                failed(stage)
+                raise
+            finally:
+                record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def upstream(host, seconds, outcome):
+    """
+    Registra uma chamada HTTP a um upstream; outcome é o status HTTP ou o nome da exceção.
+    """
+    observe('fenixsky_upstream_seconds', seconds, host=host)
+    inc('fenixsky_upstream_requests_total', host=host, outcome=str(outcome))
+    # Erro de rede, 5xx ou 429 contam como falha do upstream; 404 é só 'não encontrado'
+    if not isinstance(outcome, int) or outcome >= 500 or outcome == 429:
+        failed(host)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((host, seconds))
+
+
+def queued(host, seconds, timed_out=False):
+    """
+    Registra o tempo de espera na fila de um host; esperas visíveis também vão para o Server-Timing.
+    """
+    observe('fenixsky_upstream_queue_seconds', seconds, host=host)
+    if timed_out:
+        inc('fenixsky_upstream_queue_timeouts_total', host=host)
+        failed(host)
+    timings = _timings.get()
+    if timings is not None and seconds >= 0.001:
+        timings.append((f'queue.{host}', seconds))
+
+
+def cache_access(cache, hit):
+    inc('fenixsky_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def start_request():
+    """
+    Começa a coletar os tempos da requisição atual; devolve a lista que será preenchida.
+    Threads só enxergam a lista se rodarem com uma cópia do contexto (contextvars.copy_context).
+    """
+    timings = []
+    _timings.set(timings)
+    return timings
+
+
+def server_timing(timings, total=None):
+    """
+    Monta o cabeçalho Server-Timing, somando as etapas repetidas.
+    """
+    summary = {}
+    for stage, seconds in list(timings):
+        duration, count = summary.get(stage, (0.0, 0))
+        summary[stage] = (duration + seconds, count + 1)
+    parts = [f'{stage};dur={duration * 1000:.1f}' + (f';desc="x{count}"' if count > 1 else '')
+             for stage, (duration, count) in summary.items()]
+    if total is not None:
+        parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def render():
+    """
+    Todas as métricas deste processo no formato texto do Prometheus.
+    Com vários workers, cada um tem os seus próprios números.
+    """
+    with _lock:
+        histograms = sorted((key, (list(h.buckets), h.sum, h.count)) for key, h in _histograms.items())
+        counters = sorted(_counters.items())
+    lines = []
+    typed = set()
+
+    def declare(name, kind):
+        if name not in typed:
+            typed.add(name)
+            lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), (buckets, total, count) in histograms:
+        declare(name, 'histogram')
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + ('+Inf',), buckets):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {total:.6f}')
+        lines.append(f'{name}_count{_labels(labels)} {count}')
+
+    hits = {}
+    for (name, labels), value in counters:
+        declare(name, 'counter')
+        lines.append(f'{name}{_labels(labels)} {value}')
+        if name == 'fenixsky_cache_requests_total':
+            label = dict(labels)
+            hits.setdefault(label['cache'], [0, 0])[label['result'] == 'hit'] += value
+    for cache, (misses, cache_hits) in sorted(hits.items()):
+        declare('fenixsky_cache_hit_ratio', 'gauge')
+        lines.append(f'fenixsky_cache_hit_ratio{_labels((("cache", cache),))} {cache_hits / (cache_hits + misses):.4f}')
+
+    for name, (func, label) in sorted(_gauges.items()):
+        try:
+            value = func()
+        except Exception as e:
+            logging.error(f"Erro ao ler a métrica {name}: {e}")
+            continue
+        declare(name, 'gauge')
+        if label:
+            for label_value, number in sorted(value.items()):
+                lines.append(f'{name}{_labels(((label, label_value),))} {number}')
+        else:
+            lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
@@ -1,14 +1,64 @@
 from urllib.parse import urlparse, quote_plus
-import requests
-from bs4 import BeautifulSoup
+import http_client
+from parsing import parse
 import re
 import json
+import os
+import time
+import threading
+import metrics
+from cache import make_cache, memoize
+from stream_cache import cached_resolver
+from parallel import parallel_map
+from matching import Query, best_match
+from singleflight import flight
 
+# Metadados do IMDb (títulos e ano) quase nunca mudam
+title_cache = make_cache(
+    'imdb',
+    maxsize=int(os.environ.get("IMDB_CACHE_SIZE", "2048")),
+    ttl=float(os.environ.get("IMDB_CACHE_TTL", str(7 * 24 * 3600))),
+    path=os.environ.get("IMDB_CACHE_PATH") or None,
+)
+# Show do netcine e mapa de episódios por IMDb id; atualizado quando o episódio pedido não está no mapa
+episode_cache = make_cache(
+    'netcine_show',
+    maxsize=int(os.environ.get("EPISODE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("EPISODE_CACHE_TTL", str(6 * 3600))),
+)
+EPISODE_REFRESH_INTERVAL = float(os.environ.get("EPISODE_REFRESH_INTERVAL", "300"))
+# Série que o netcine não tem: lembrada por pouco tempo para não refazer a busca a cada episódio
+EPISODE_MISSING_TTL = float(os.environ.get("EPISODE_MISSING_TTL", "600"))
+# Sugestões do IMDb para a busca do catálogo
+catalog_cache = make_cache(
+    'catalog',
+    maxsize=int(os.environ.get("CATALOG_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("CATALOG_CACHE_TTL", "3600")),
+)
+# Mirror atual do netcine (destino do redirect de HOST); o registro dura mais que o TTL
+# para o valor antigo continuar servindo enquanto a atualização roda em segundo plano
+MIRROR_TTL = float(os.environ.get("NETCINE_MIRROR_TTL", "3600"))
+mirror_cache = make_cache('netcine_mirror', maxsize=16, ttl=MIRROR_TTL * 24)
+mirrors_refreshing = set()
+mirror_lock = threading.Lock()
+
+HOST = 'https://netcinez.si/'
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, como Gecko) Chrome/88.0.4324.96 Safari/537.36"}
+
+_source_re = re.compile(r'<source[^>]*\s+src="([^"]+)"')
+_ld_json_re = re.compile('json">(.*?)</script>', re.DOTALL)
+_title_re = re.compile('<title>(.*?)</title>')
+_series_year_re = re.compile(r'Série de TV (.*?)\)')
+_year_re = re.compile(r'\((.*?)\)')
+
+
+@memoize(catalog_cache)
+@metrics.timed('imdb_suggestion')
 def catalog_search(text):
     catalog = []
     url = 'https://v3.sg.media-imdb.com/suggestion/x/' + quote_plus(text) + '.json?includeVideos=1'
     try:
-        data = requests.get(url).json()['d']
+        data = http_client.get(url).json()['d']
         for i in data:
             try:
                 poster = i['i']['imageUrl']
@@ -26,12 +76,15 @@ def catalog_search(text):
                         "year": int(y),
                         "poster": poster
                     })
-            except:
-                pass
-    except:
-        pass
+            except (KeyError, TypeError, ValueError):
+                # Sugestão sem pôster/ano (pessoas, vídeos...)
+                continue
+    except Exception as e:
+        metrics.error('imdb_suggestion', e)
     return catalog
 
+@cached_resolver('netcine')
+@metrics.timed('netcine_resolve')
 def resolve_stream(url):
     parsed_url = urlparse(url)
     referer = '%s://%s/'%(parsed_url.scheme,parsed_url.netloc)        
@@ -39,20 +92,19 @@ def resolve_stream(url):
     headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, como Gecko) Chrome/88.0.4324.96 Safari/537.36"}
     headers.update({'Cookie': 'XCRF%3DXCRF', 'Referer': referer})
     try:
-        r = requests.get(url,headers=headers)
+        r = http_client.get(url,headers=headers)
         src = r.text
-        soup = BeautifulSoup(src, 'html.parser')
+        soup = parse(src, 'div', id='content')
         url = soup.find('div', {'id': 'content'}).find_all('a')[0].get('href', '') 
-    except:
-        pass        
+    except Exception as e:
+        metrics.error('netcine_resolve', e)
             
     try:
-        r = requests.get(url,headers=headers)
+        r = http_client.get(url,headers=headers)
         src = r.text
-        regex_pattern = r'<source[^>]*\s+src="([^"]+)"'
         alto = []
         baixo = []
-        matches = re.findall(regex_pattern, src)
+        matches = _source_re.findall(src)
         for match in matches:
             if 'ALTO' in match:
                 alto.append(match)
@@ -70,18 +122,21 @@ def resolve_stream(url):
             stream = baixo[-1]
             if ' ' in stream:
                 stream = ''            
-    except:
-        pass
+    except Exception as e:
+        metrics.error('netcine_resolve', e)
     return stream, headers
 
+@memoize(title_cache, should_cache=lambda result: result[0])
+@metrics.timed('imdb_title')
 def search_term(imdb):
     url = 'https://www.imdb.com/pt/title/%s/'%imdb
     keys = []
+    year = ''
     try:
-        r = requests.get(url,headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:134.0) Gecko/20100101 Firefox/134.0', 'Accept-Language': 'pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3'})
+        r = http_client.get(url,headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:134.0) Gecko/20100101 Firefox/134.0', 'Accept-Language': 'pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3'})
         src = r.text
-        script = re.findall('json">(.*?)</script>', src, re.DOTALL)[0]
-        title = re.findall('<title>(.*?)</title>', src)[0]
+        script = _ld_json_re.findall(src)[0]
+        title = _title_re.findall(src)[0]
         data = json.loads(script)
         name = data.get('name', '')
         name2 = data.get('alternateName', '')
@@ -89,30 +144,23 @@ def search_term(imdb):
             keys.append(name)
         if name2:
             keys.append(name2)
-        try:
-            year_ = re.findall(r'Série de TV (.*?)\)', title)
-            if not year_:
-                year_ = re.findall(r'\((.*?)\)', title)
-            if year_:
-                year = year_[0]
-                try:
-                    year = year.split('–')[0]
-                except:
-                    pass
-        except:
-            year = ''       
-
-    except:
-        pass
+        year_ = _series_year_re.findall(title)
+        if not year_:
+            year_ = _year_re.findall(title)
+        if year_:
+            year = year_[0].split('–')[0]
+    except Exception as e:
+        metrics.error('imdb_title', e)
     return keys, year
 
+@metrics.timed('netcine_player')
 def opcoes_filmes(url, headers, host):
     player_links = []
     try:
         headers.update({'Cookie': 'XCRF%3DXCRF'})
-        r = requests.get(url, headers=headers)
+        r = http_client.get(url, headers=headers)
         src = r.text
-        soup = BeautifulSoup(src, 'html.parser')
+        soup = parse(src, 'div', id='player-container')
         player = soup.find('div', {'id': 'player-container'})
         botoes = player.find('ul', {'class': 'player-menu'})
         op = botoes.findAll('li')
@@ -131,246 +179,220 @@ def opcoes_filmes(url, headers, host):
                 
                 if not 'streamtape' in link:
                     player_links.append({'name': name.replace(' 1', ''), 'url': link})
-    except:
-        pass
+    except Exception as e:
+        metrics.error('netcine_player', e)
     return player_links
 
-def check_item(search,headers,year_imdb,text):
-    r = requests.get(search,headers=headers)
-    src = r.text
-    soup = BeautifulSoup(src,'html.parser')
+@metrics.timed('netcine_search')
+def search_candidates(search, headers):
+    """
+    Lê os resultados de uma busca '?s=' do netcine como (nome, ano, link).
+    """
+    r = http_client.get(search,headers=headers)
+    soup = parse(r.text, 'div', id='box_movies')
     box = soup.find("div", {"id": "box_movies"})
-    movies = box.findAll("div", {"class": "movie"})
-    count = 0
-    for i in movies:
+    candidates = []
+    for i in box.find_all("div", {"class": "movie"}):
+        h2 = i.find('h2')
         try:
             year = i.find('span', {'class': 'year'}).text
-            year = year.replace('–', '')
-        except:
+        except AttributeError:
             year = ''
-        name = i.find('h2').text
         try:
-            name = name.decode('utf-8')
-        except: pass
+            link = i.find('div', {'class': 'imagen'}).find('a').get('href', '')
+        except AttributeError:
+            link = ''
+        if h2 and link:
+            candidates.append((h2.text, year, link))
+    return candidates
+
+@metrics.timed('netcine_mirror')
+def resolve_mirror(host):
+    """
+    Segue o redirect do domínio do netcine até o mirror atual.
+    """
+    url = http_client.get(host, headers=HEADERS).url
+    url_parsed = urlparse(url)
+    new_host = url_parsed.scheme + '://' + url_parsed.hostname + '/'
+    http_client.configure_host(new_host, headers={'Cookie': http_client.NETCINE_COOKIE})
+    return new_host
+
+def current_mirror(host=None, refresh=False):
+    """
+    Devolve o mirror atual do netcine, resolvido uma vez e guardado por MIRROR_TTL.
+    Depois do TTL, o valor antigo continua sendo usado enquanto um novo é resolvido em segundo plano.
+    """
+    host = host or HOST
+    mirror = None if refresh else mirror_cache.get(host)
+    if not mirror:
+        return _refresh_mirror(host)
+    if mirror['expires'] < time.time():
+        with mirror_lock:
+            stale = host not in mirrors_refreshing
+            mirrors_refreshing.add(host)
+        if stale:
+            threading.Thread(target=_refresh_mirror, args=(host,), daemon=True).start()
+    return mirror['host']
+
+@flight()
+def _refresh_mirror(host):
+    try:
         try:
-            name = name.decode()
-        except: pass           
-        if ':' in text:
-            text_search = text.split(':')[1].replace(' ', '').lower()
-            name_search = name.replace(' ', '').lower()
-            if text_search in name_search:
-                count += 1
-                break
-        else:
-            if str(year_imdb) in str(year):
-                count += 1
-                break
-            elif str(int(year_imdb) + 1) in str(year):
-                count += 1         
-                break
-            elif str(int(year_imdb) - 1) in str(year):
-                count += 1
-                break
-    if count > 0:
-        return movies
-    else:
-        return []        
+            new_host = resolve_mirror(host)
+        except Exception:
+            mirror = mirror_cache.get(host)
+            if not mirror:
+                raise
+            # Mantém o mirror conhecido e tenta de novo no próximo TTL
+            new_host = mirror['host']
+        mirror_cache.set(host, {'host': new_host, 'expires': time.time() + MIRROR_TTL})
+        return new_host
+    finally:
+        with mirror_lock:
+            mirrors_refreshing.discard(host)
 
 def scrape_search(host,headers,text,alternate,year_imdb,type):
     text = text.replace('&amp;', '&')
     alternate = alternate.replace('&amp;', '&')
-    url = requests.get(host,headers=headers).url
-    url_parsed = urlparse(url)
-    new_host = url_parsed.scheme + '://' + url_parsed.hostname + '/'
-    try:
-        keys_search = text.split(' ')
-        search_ = ' '.join(keys_search[:-1]) if len(keys_search) > 2 else text
-    except: search_ = text
-    try:
-        if len(search_.split(' ')) > 2 and ':' in text:
-            search_ = text.split(': ')[1]
-    except: pass   
-    url_search = new_host + '?s=' + quote_plus(search_)
+    new_host = current_mirror(host)
+    keys_search = text.split(' ')
+    search_ = ' '.join(keys_search[:-1]) if len(keys_search) > 2 else text
+    if len(search_.split(' ')) > 2 and ': ' in text:
+        search_ = text.split(': ')[1]
     headers.update({'Cookie': 'XCRF%3DXCRF'})
-    movies = check_item(url_search,headers,year_imdb,text)
-    if not movies:
-        try:
-            if ':' in text:
-                param_search = text.split(':')[1]
-                url_search2 = new_host + '?s=' + quote_plus(param_search)
-                movies = check_item(url_search2,headers,year_imdb,text)
-        except: movies = []
-    for i in movies:
-        name = i.find('h2').text
-        try: name = name.decode('utf-8')
-        except: pass
-        name_backup = name
-        text_backup = text
-        textalternate_backup = alternate
-        try:
-            keys = name.split(' ')
-            name2 = ' '.join(keys[:-1])
-        except: name2 = ''
-        try:
-            keys2 = text.split(' ')
-            text2 = ' '.join(keys2[:-1])
-        except: text2 = ''                           
-        try:
-            year = i.find('span', {'class': 'year'}).text
-            year = year.replace('–', '')
-        except:
-            year = ''
-        try:
-            text = text.lower().replace(':', '')
-        except: pass
-        try:
-            textalternate = alternate.lower().replace(':', '')
-        except: pass        
-        try:
-            name = name.lower().replace(':', '')
-        except: pass
-        try:
-            text2 = text2.lower()
-        except: pass
-        try:
-            name2 = name2.lower()
-        except: pass
-        try:
-            name3 = name2.replace(' –', ':')
-        except: name3 = ''
+    query = Query([text, alternate], year_imdb)
+    terms = [search_]
+    if ':' in text:
+        # Busca extra pelo subtítulo, só se a primeira não tiver um resultado bom
+        terms.append(text.split(':')[1].strip())
+    for n, term in enumerate(dict.fromkeys(terms)):
         try:
-            count_text = len(name3.split(' '))
-        except: count_text = 0
-        try:
-            if ':' in name_backup:
-                name4 = name_backup.split(': ')[1].lower()
-            else: name4 = ''
-        except: name4 = ''
-        try:
-            if ':' in text_backup:
-                text3 = text_backup.split(': ')[1].lower()
-            else: text3 = ''
-        except: text3 = ''
-        try:
-            if ':' in textalternate_backup:
-                textalternate2 = textalternate_backup.split(': ')[1].lower()
-            else: textalternate2 = ''
-        except: textalternate2 = ''            
-        if '&' in text:
-            text4 = text.replace('&', 'e')
-        else: text4 = text
-        if '&' in name and not '&amp;' in name:
-            name5 = name.replace('&', 'e')
-        else: name5 = name
-        if ' e ' in text:
-            text5 = text.replace(' e ', ' & ')
-        else: text5 = text 
-        if ' e ' in name:
-            name6 = name.replace(' e ', ' & ')
-        else: name6 = name
-        try:
-            count_text2 = len(text.split(' '))
-        except: count_text2 = 0
-        try:
-            img = i.find('div', {'class': 'imagen'})
-            link = img.find('a').get('href', '')
-        except: link = ''
-        count_name_ = len(name)
-        count_text_ = len(text)
-        if type == 'tvshows' and '/tvshows/' in link:
-            if text in name and str(year_imdb) in str(year) or text2 in name2 and str(year_imdb) in str(year):
-                return link, new_host
-            elif text2 in name3 and str(year_imdb) in str(year):
-                return link, new_host 
-            elif text2 in name3 and str(int(year_imdb) + 1) in str(year) and count_text > 1 and not count_name_ > count_text_:     
-                return link, new_host
-            elif text2 in name3 and str(int(year_imdb) - 1) in str(year) and count_text > 1 and not count_name_ > count_text_:    
-                return link, new_host
-            elif text3 in name4 and str(year_imdb) in str(year) and text3 and name4:
-                return link, new_host
-            elif text4 in name5 and str(year_imdb) in str(year) and text4 and name5:               
-                return link, new_host
-            elif len(text5) == len(name6) and str(year_imdb) in str(year) and text5 and name6:              
-                return link, new_host
-            elif textalternate in name and str(year_imdb) in str(year) or textalternate2 in name4 and str(year_imdb) in str(year):
-                return link, new_host
-            elif text in name and str(int(year_imdb) + 1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
-                return link, new_host
-            elif text in name and str(int(year_imdb) -1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
-                return link, new_host              
-        elif type == 'movies' and not '/tvshows/' in link: 
-            if text in name and str(year_imdb) in str(year) or text2 in name2 and str(year_imdb) in str(year):
-                return link, new_host
-            elif text2 in name3 and str(year_imdb) in str(year):
-                return link, new_host 
-            elif text2 in name3 and str(int(year_imdb) + 1) in str(year) and count_text > 1 and not count_name_ > count_text_:     
-                return link, new_host
-            elif text2 in name3 and str(int(year_imdb) - 1) in str(year) and count_text > 1 and not count_name_ > count_text_:    
-                return link, new_host
-            elif text3 in name4 and str(year_imdb) in str(year) and text3 and name4:
-                return link, new_host
-            elif text4 in name5 and str(year_imdb) in str(year) and text4 and name5:               
-                return link, new_host
-            elif len(text5) == len(name6) and str(year_imdb) in str(year) and text5 and name6:              
-                return link, new_host
-            elif textalternate in name and str(year_imdb) in str(year) or textalternate2 in name4 and str(year_imdb) in str(year):
-                return link, new_host
-            elif text in name and str(int(year_imdb) + 1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
-                return link, new_host
-            elif text in name and str(int(year_imdb) -1) in str(year) and count_text2 > 0 and not count_name_ > count_text_:
-                return link, new_host                                                            
-    return '', ''   
+            candidates = search_candidates(new_host + '?s=' + quote_plus(term), headers)
+        except Exception:
+            if n:
+                break
+            # O mirror em cache pode ter caído ou mudado: resolve de novo e tenta mais uma vez
+            old_host, new_host = new_host, current_mirror(host, refresh=True)
+            if new_host == old_host:
+                raise
+            candidates = search_candidates(new_host + '?s=' + quote_plus(term), headers)
+        link = best_match(query, candidates, type)
+        if link:
+            return link, new_host
+    return '', ''
+
+@flight(lambda imdb, refresh=False: (imdb, refresh))
+def show_episodes(imdb, refresh=False):
+    """
+    Devolve o show do netcine com o mapa temporada -> episódios, em cache por IMDb id:
+    {'host': mirror, 'link': página do show, 'seasons': [[link_ep, ...], ...]}.
+    Séries que o netcine não tem ficam em cache como {'missing': True} por EPISODE_MISSING_TTL.
+    """
+    if not refresh:
+        show = episode_cache.get(imdb)
+        metrics.cache_access('netcine_show', bool(show))
+        if show:
+            return None if show.get('missing') else show
+    headers = dict(HEADERS)
+    search_text, year_imdb = search_term(imdb)
+    if not (search_text and year_imdb):
+        return None
+    text, alternate = search_text[-1], search_text[0]
+    link, new_host = scrape_search(HOST, headers, text, alternate, year_imdb, 'tvshows')
+    if not '/tvshows/' in link:
+        episode_cache.set(imdb, {'missing': True, 'fetched': time.time()}, ttl=EPISODE_MISSING_TTL)
+        return None
+    start = time.perf_counter()
+    r = http_client.get(link, headers=headers)
+    soup = parse(r.text, 'div', id='cssmenu')
+    s = soup.find('div', {'id': 'cssmenu'}).find('ul').findAll('li', {'class': 'has-sub'})
+    seasons = []
+    for i in s:
+        episodes = []
+        for i_ep in i.find('ul').findAll('li'):
+            a = i_ep.find('a')
+            episodes.append(a.get('href') if a else None)
+        seasons.append(episodes)
+    metrics.record('netcine_show', time.perf_counter() - start)
+    show = {'host': new_host, 'link': link, 'seasons': seasons, 'fetched': time.time()}
+    episode_cache.set(imdb, show)
+    return show
+
+def rebase(link, host):
+    """
+    Troca o domínio de um link do netcine pelo do mirror 'host' (links guardados em cache
+    continuam apontando para o mirror da época).
+    """
+    parsed = urlparse(link)
+    return host.rstrip('/') + link[len(f"{parsed.scheme}://{parsed.netloc}"):]
+
+def episode_link(show, season, episode):
+    try:
+        if season < 1 or episode < 1:
+            return None
+        return show['seasons'][season - 1][episode - 1]
+    except (IndexError, KeyError, TypeError):
+        return None
+
+def next_episode(imdb, season, episode):
+    """
+    Próximo episódio (temporada, episódio) segundo o mapa em cache; None se for o último.
+    Sem mapa em cache, supõe o episódio seguinte da mesma temporada.
+    """
+    show = episode_cache.get(imdb)
+    if not show or show.get('missing'):
+        return season, episode + 1
+    seasons = show['seasons']
+    if 0 < season <= len(seasons) and episode < len(seasons[season - 1]):
+        return season, episode + 1
+    if season < len(seasons):
+        return season + 1, 1
+    return None
+
+def resolve_options(player_options):
+    streams = []
+    resolved = parallel_map(resolve_stream, [option['url'] for option in player_options], default=('', None))
+    for option, (stream_url, stream_headers) in zip(player_options, resolved):
+        if stream_url:
+            streams.append({
+                "name": f"Netcine - {option['name']}",
+                "url": stream_url,
+                "behaviorHints": {"notWebReady": True, "proxyHeaders": {"request": stream_headers}}
+            })
+    return streams
 
 def search_link(id):
     streams = []
-    host = 'https://netcinez.si/'
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, como Gecko) Chrome/88.0.4324.96 Safari/537.36"}
-    
+    headers = dict(HEADERS)
+
     try:
         if ':' in id: # Lógica para Séries
             parts = id.split(':')
-            imdb, season, episode = parts[0], parts[1], parts[2]
-            search_text, year_imdb = search_term(imdb)
-            if search_text and year_imdb:
-                text, alternate = search_text[-1], search_text[0]
-                link, new_host = scrape_search(host, headers, text, alternate, year_imdb, 'tvshows')
-                if '/tvshows/' in link:
-                    r = requests.get(link, headers=headers)
-                    soup = BeautifulSoup(r.text, 'html.parser')
-                    s = soup.find('div', {'id': 'movie'}).find('div', {'class': 'post'}).find('div', {'id': 'cssmenu'}).find('ul').findAll('li', {'class': 'has-sub'})
-                    for n, i in enumerate(s, 1):
-                        if int(season) == n:
-                            e = i.find('ul').findAll('li')
-                            for n_ep, i_ep in enumerate(e, 1):
-                                if int(episode) == n_ep:
-                                    link_ep = i_ep.find('a').get('href')
-                                    player_options = opcoes_filmes(link_ep, headers, new_host)
-                                    for option in player_options:
-                                        stream_url, stream_headers = resolve_stream(option['url'])
-                                        if stream_url:
-                                            streams.append({
-                                                "name": f"Netcine - {option['name']}",
-                                                "url": stream_url,
-                                                "behaviorHints": {"notWebReady": True, "proxyHeaders": {"request": stream_headers}}
-                                            })
-                                    break
-                            break   
+            imdb, season, episode = parts[0], int(parts[1]), int(parts[2])
+            show = show_episodes(imdb)
+            link_ep = episode_link(show, season, episode)
+            if show and not link_ep and time.time() - show.get('fetched', 0) > EPISODE_REFRESH_INTERVAL:
+                # Episódio fora do mapa em cache: o show pode ter episódios novos
+                show = show_episodes(imdb, refresh=True)
+                link_ep = episode_link(show, season, episode)
+            if link_ep:
+                # O show fica horas em cache: usa o mirror atual, e resolve de novo se ele não responder
+                mirror = current_mirror(HOST)
+                player_options = opcoes_filmes(rebase(link_ep, mirror), headers, mirror)
+                if not player_options:
+                    old_mirror, mirror = mirror, current_mirror(HOST, refresh=True)
+                    if mirror != old_mirror:
+                        player_options = opcoes_filmes(rebase(link_ep, mirror), headers, mirror)
+                streams = resolve_options(player_options)
         else: # Lógica para Filmes
             imdb = id
             search_text, year_imdb = search_term(imdb)
             if search_text and year_imdb:
                 text, alternate = search_text[-1], search_text[0]
-                link, new_host = scrape_search(host, headers, text, alternate, year_imdb, 'movies')
+                link, new_host = scrape_search(HOST, headers, text, alternate, year_imdb, 'movies')
                 if link and not '/tvshows/' in link:
                     player_options = opcoes_filmes(link, headers, new_host)
-                    for option in player_options:
-                        stream_url, stream_headers = resolve_stream(option['url'])
-                        if stream_url:
-                            streams.append({
-                                "name": f"Netcine - {option['name']}",
-                                "url": stream_url,
-                                "behaviorHints": {"notWebReady": True, "proxyHeaders": {"request": stream_headers}}
-                            })
-    except:
-        pass
-    return streams
\ No newline at end of file
+                    streams = resolve_options(player_options)
+    except Exception as e:
+        metrics.error('netcine', e)
+    return streams
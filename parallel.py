@@ -0,0 +1,47 @@
+import contextvars
+import itertools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Pool compartilhado para resolver opções de player; cada chamada usa no máximo RESOLVE_CONCURRENCY threads
+RESOLVE_WORKERS = int(os.environ.get("RESOLVE_WORKERS", "16"))
+RESOLVE_CONCURRENCY = int(os.environ.get("RESOLVE_CONCURRENCY", "4"))
+resolve_executor = ThreadPoolExecutor(max_workers=RESOLVE_WORKERS, thread_name_prefix="resolve")
+
+
+def parallel_map(func, items, limit=None, default=None):
+    """
+    Aplica func a cada item em paralelo, com no máximo 'limit' chamadas simultâneas.
+    Os resultados saem na mesma ordem dos itens; chamadas que falham viram 'default'.
+    """
+    items = list(items)
+    limit = limit or RESOLVE_CONCURRENCY
+    results = [default] * len(items)
+    if len(items) <= 1 or limit <= 1:
+        for index, item in enumerate(items):
+            try:
+                results[index] = func(item)
+            except Exception as e:
+                logging.error(f"Erro em {getattr(func, '__name__', func)}: {e}")
+        return results
+
+    queue = iter(enumerate(items))
+    pending = {}
+
+    def submit(count):
+        for index, item in itertools.islice(queue, count):
+            # Cada thread leva uma cópia do contexto (tempos da requisição para o Server-Timing)
+            pending[resolve_executor.submit(contextvars.copy_context().run, func, item)] = index
+
+    submit(limit)
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                logging.error(f"Erro em {getattr(func, '__name__', func)}: {e}")
+        submit(len(done))
+    return results
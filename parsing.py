@@ -0,0 +1,21 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Usa o lxml quando estiver instalado; senão, o html.parser da biblioteca padrão
+try:
+    import lxml  # noqa: F401
+    FEATURES = 'lxml'
+except ImportError:
+    FEATURES = 'html.parser'
+
+
+def parse(html, *args, **kwargs):
+    """
+    Parseia só a região da página que casa com SoupStrainer(*args, **kwargs).
+    Sem argumentos, ou se a região não existir na página, parseia a página inteira
+    com o html.parser, como antes.
+    """
+    if args or kwargs:
+        soup = BeautifulSoup(html, FEATURES, parse_only=SoupStrainer(*args, **kwargs))
+        if soup.contents:
+            return soup
+    return BeautifulSoup(html, 'html.parser')
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import os
+
+from cache import make_cache, in_thread
+
+# Pré-busca do próximo episódio de uma série, em segundo plano
+PREFETCH_ENABLED = os.environ.get("PREFETCH", "1") not in ("0", "false", "False", "")
+PREFETCH_MAX_PENDING = int(os.environ.get("PREFETCH_MAX_PENDING", "2"))
+PREFETCH_DELAY = float(os.environ.get("PREFETCH_DELAY", "1"))
+PREFETCH_TTL = float(os.environ.get("PREFETCH_TTL", "300"))
+
+
+class Prefetcher:
+    """
+    Depois de responder um episódio, busca o seguinte em segundo plano e guarda o resultado
+    por PREFETCH_TTL. No máximo 'max_pending' pré-buscas por worker ao mesmo tempo; as
+    demais são descartadas.
+    fetch(type, id) é a corrotina que devolve o que guardar (nada é guardado se vier vazio);
+    next_id(id) devolve o id do próximo episódio ou None; a corrotina opcional cached(type, id)
+    diz se o episódio já está guardado em outro lugar (o cache de respostas), e aí não é buscado.
+    """
+
+    def __init__(self, fetch, next_id, cached=None, enabled=PREFETCH_ENABLED, max_pending=PREFETCH_MAX_PENDING,
+                 delay=PREFETCH_DELAY, ttl=PREFETCH_TTL):
+        self.fetch = fetch
+        self.next_id = next_id
+        self.cached = cached
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.delay = delay
+        self.cache = make_cache('prefetch', maxsize=1024, ttl=ttl)
+        self.stats = {"scheduled": 0, "completed": 0, "failed": 0, "dropped": 0, "cached": 0, "hits": 0, "misses": 0}
+        self._pending = set()
+
+    async def get(self, type, id):
+        """
+        Resultado pré-buscado do episódio, ou None. Conta acerto/erro para episódios de série.
+        """
+        if not self.enabled or type != 'series':
+            return None
+        result = await in_thread(self.cache.get, f"{type}:{id}")
+        self.stats["hits" if result else "misses"] += 1
+        return result
+
+    def schedule(self, type, id):
+        if not self.enabled or type != 'series':
+            return
+        asyncio.ensure_future(self._schedule(type, id))
+
+    async def _schedule(self, type, id):
+        # next_id e o cache podem fazer I/O (mapa de episódios, backends SQLite/Redis): fora do loop
+        try:
+            next_id = await in_thread(self.next_id, id)
+            if not next_id or await in_thread(self.cache.get, f"{type}:{next_id}"):
+                return
+            if self.cached and await self.cached(type, next_id):
+                self.stats["cached"] += 1
+                return
+        except Exception as e:
+            logging.warning(f"Falha ao agendar a pré-busca depois de {id}: {e}")
+            return
+        if (type, next_id) in self._pending:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            return
+        self._pending.add((type, next_id))
+        self.stats["scheduled"] += 1
+        await self._run(type, next_id)
+
+    async def _run(self, type, id):
+        try:
+            # Espera um pouco para não disputar recursos com a resposta que acabou de sair
+            await asyncio.sleep(self.delay)
+            result = await self.fetch(type, id)
+            if result:
+                await in_thread(self.cache.set, f"{type}:{id}", result)
+            self.stats["completed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.warning(f"Falha na pré-busca de {id}: {e}")
+        finally:
+            self._pending.discard((type, id))
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
@@ -0,0 +1,146 @@
+import os
+import re
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import http_client
+import metrics
+from cache import make_cache
+from stream_cache import invalidate
+
+# Teste opcional dos links antes de responder o /stream: remove os que estão fora do ar e
+# ordena os demais pelo tempo até o primeiro byte (TTFB) e pela qualidade
+PROBE_ENABLED = os.environ.get("STREAM_PROBE", "0") not in ("0", "false", "False", "")
+PROBE_BUDGET = float(os.environ.get("PROBE_BUDGET", "1.5"))
+PROBE_TIMEOUT = float(os.environ.get("PROBE_TIMEOUT", "2"))
+PROBE_TTL = float(os.environ.get("PROBE_TTL", "300"))
+PROBE_WORKERS = int(os.environ.get("PROBE_WORKERS", "16"))
+# Diferenças de TTFB menores que isso não mudam a ordem; a qualidade decide
+PROBE_TTFB_STEP = float(os.environ.get("PROBE_TTFB_STEP", "0.25"))
+
+probe_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="probe")
+# Resultado por link e por host ('host:<nome>'): {'ok': bool, 'ttfb': segundos ou None}
+probe_cache = make_cache('probe', maxsize=4096, ttl=PROBE_TTL)
+
+QUALITY_HINTS = [
+    (re.compile(r'2160|4k|uhd', re.IGNORECASE), 4),
+    (re.compile(r'1080|fhd|full ?hd', re.IGNORECASE), 3),
+    (re.compile(r'720|\bhd\b|alto', re.IGNORECASE), 2),
+    (re.compile(r'480|360|\bsd\b|baixo', re.IGNORECASE), 1),
+]
+
+
+def quality(stream):
+    text = f"{stream.get('name', '')} {stream.get('title', '')} {stream.get('url', '')}"
+    for pattern, rank in QUALITY_HINTS:
+        if pattern.search(text):
+            return rank
+    return 0
+
+
+def probe(url, headers=None):
+    """
+    Pede só o primeiro byte do link e mede o TTFB. Link com 404/410 ou 5xx está morto (e sai
+    do cache de links resolvidos); falha de DNS ou conexão recusada derruba também o host.
+    Timeout não é queda: o link fica sem resultado (None), como se não tivesse dado tempo.
+    """
+    # requests já foi carregado pelo http_client (ver FAST_START no app.py)
+    import requests
+    host = urlparse(url).hostname or ''
+    start = time.perf_counter()
+    try:
+        response = http_client.get(url, headers=dict(headers or {}, Range='bytes=0-0'),
+                                   timeout=(PROBE_TIMEOUT, PROBE_TIMEOUT), stream=True)
+        response.close()
+    except (requests.Timeout, http_client.QueueTimeout):
+        metrics.inc('fenixsky_probe_total', outcome='timeout')
+        return None
+    except requests.ConnectionError as e:
+        if not host_unreachable(e):
+            # Reset, erro de SSL e afins podem ser só deste link ou passageiros: fica sem resultado
+            metrics.inc('fenixsky_probe_total', outcome='connection_error')
+            return None
+        result = {'ok': False, 'ttfb': None}
+        probe_cache.set(f"host:{host}", result)
+        metrics.inc('fenixsky_probe_total', outcome='host_down')
+        return result
+    except Exception as e:
+        metrics.error('probe', e)
+        return None
+    ttfb = time.perf_counter() - start
+    ok = response.status_code not in (404, 410) and response.status_code < 500
+    result = {'ok': ok, 'ttfb': ttfb}
+    probe_cache.set(url, result)
+    probe_cache.set(f"host:{host}", {'ok': True, 'ttfb': ttfb})
+    metrics.observe('fenixsky_probe_ttfb_seconds', ttfb, host=host)
+    metrics.inc('fenixsky_probe_total', outcome='alive' if ok else 'dead')
+    if not ok:
+        invalidate(url)
+    return result
+
+
+def host_unreachable(error):
+    """
+    True se na cadeia de exceções (requests -> urllib3 -> socket) há falha de DNS ou conexão
+    recusada, os únicos erros que valem para o host inteiro.
+    """
+    pending, seen = [error], set()
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, (socket.gaierror, ConnectionRefusedError)):
+            return True
+        pending += [error.__cause__, error.__context__, getattr(error, 'reason', None)]
+        pending += [arg for arg in error.args if isinstance(arg, BaseException)]
+    return False
+
+
+def _known(url):
+    result = probe_cache.get(url)
+    if result is None:
+        host = probe_cache.get(f"host:{urlparse(url).hostname or ''}")
+        if host and not host['ok']:
+            return host
+    return result
+
+
+@metrics.timed('probe')
+def rank_streams(streams, budget=PROBE_BUDGET):
+    """
+    Testa em paralelo os links ainda sem resultado em cache, dentro de 'budget' segundos.
+    Devolve só os vivos, do menor TTFB para o maior (e da maior qualidade para a menor);
+    links que não responderam a tempo vão no fim, na ordem original.
+    """
+    results = {}
+    futures = {}
+    for stream in streams:
+        url = stream.get('url')
+        if not url or url in results or url in futures.values():
+            continue
+        known = _known(url)
+        if known is not None:
+            results[url] = known
+        else:
+            headers = stream.get('behaviorHints', {}).get('proxyHeaders', {}).get('request')
+            futures[probe_executor.submit(probe, url, headers)] = url
+    if futures:
+        done, _ = wait(futures, timeout=budget)
+        for future in done:
+            if future.result() is not None:
+                results[futures[future]] = future.result()
+
+    ranked = []
+    for index, stream in enumerate(streams):
+        result = results.get(stream.get('url'))
+        if result and not result['ok']:
+            continue
+        if result and result['ttfb'] is not None:
+            key = (0, int(result['ttfb'] / PROBE_TTFB_STEP), -quality(stream), index)
+        else:
+            key = (1, 0, 0, index)
+        ranked.append((key, stream))
+    return [stream for _, stream in sorted(ranked, key=lambda item: item[0])]
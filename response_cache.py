@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+import time
+
+import http_client
+import metrics
+from cache import make_cache, in_thread
+
+# Cache da resposta inteira do /stream. Até STREAM_SOFT_TTL a lista é servida como está; depois
+# disso continua sendo servida na hora, mas é atualizada em segundo plano; passado o TTL rígido
+# (STREAM_HARD_TTL, nunca mais que o TTL do link mais curto) é buscada de novo
+RESPONSE_CACHE_ENABLED = os.environ.get("STREAM_RESPONSE_CACHE", "1") not in ("0", "false", "False", "")
+STREAM_SOFT_TTL = float(os.environ.get("STREAM_SOFT_TTL", "120"))
+STREAM_HARD_TTL = float(os.environ.get("STREAM_HARD_TTL", "1800"))
+# Lista vazia fica pouco tempo, para um título que ainda não existe não ser buscado a cada requisição
+STREAM_EMPTY_TTL = float(os.environ.get("STREAM_EMPTY_TTL", "60"))
+# Depois de uma atualização que falhou, espera isso antes de tentar de novo
+REFRESH_BACKOFF = float(os.environ.get("STREAM_REFRESH_BACKOFF", "30"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("STREAM_RESPONSE_CACHE_SIZE", "2048"))
+
+
+class StaleWhileRevalidate:
+    """
+    Guarda o resultado da busca, com 'stale_at' e 'expires', por (tipo, id).
+    fetch(type, id, refresh=False) é a corrotina que devolve {'streams': [...], 'failed': [fontes
+    que falharam], ...} (refresh=True nas atualizações em segundo plano); ttl_of(stream) dá o
+    tempo que ainda resta a cada link (links assinados expiram antes do TTL rígido).
+    Uma atualização que volta vazia, ou com menos streams porque alguma fonte falhou, não
+    substitui a lista anterior: ela continua sendo servida até o TTL rígido.
+    """
+
+    def __init__(self, fetch, ttl_of=None, enabled=RESPONSE_CACHE_ENABLED, soft_ttl=STREAM_SOFT_TTL,
+                 hard_ttl=STREAM_HARD_TTL, empty_ttl=STREAM_EMPTY_TTL, backoff=REFRESH_BACKOFF):
+        self.fetch = fetch
+        self.ttl_of = ttl_of
+        self.enabled = enabled
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.empty_ttl = empty_ttl
+        self.backoff = backoff
+        self.cache = make_cache('stream_response', maxsize=RESPONSE_CACHE_SIZE, ttl=hard_ttl)
+        self.stats = {"fresh": 0, "stale": 0, "miss": 0, "refreshed": 0, "kept": 0, "failed": 0}
+        self._refreshing = set()
+
+    async def get(self, type, id):
+        """
+        (resultado, segundos até o TTL rígido) do cache ou da busca; lista velha dispara a atualização.
+        O cache (e o ttl_of) roda fora do event loop: os backends SQLite e Redis fazem I/O.
+        """
+        key = f"{type}:{id}"
+        if not self.enabled:
+            entry = await in_thread(self._entry, await self.fetch(type, id))
+            return entry, max(entry['expires'] - time.time(), 0)
+        entry = await in_thread(self.cache.get, key)
+        now = time.time()
+        if entry is None or entry['expires'] <= now:
+            self.stats["miss"] += 1
+            entry = await in_thread(self._store, key, await self.fetch(type, id))
+        elif entry['stale_at'] <= now:
+            self.stats["stale"] += 1
+            self.refresh(type, id)
+        else:
+            self.stats["fresh"] += 1
+        return entry, max(entry['expires'] - time.time(), 0)
+
+    async def has(self, type, id):
+        """
+        True se há uma lista de (type, id) em cache dentro do TTL rígido.
+        """
+        if not self.enabled:
+            return False
+        entry = await in_thread(self.cache.get, f"{type}:{id}")
+        return entry is not None and entry['expires'] > time.time()
+
+    def _entry(self, result):
+        now = time.time()
+        streams = result['streams']
+        ttl = self.hard_ttl if streams else self.empty_ttl
+        if streams and self.ttl_of:
+            ttl = min([ttl] + [self.ttl_of(stream) for stream in streams])
+        return dict(result, stale_at=now + min(self.soft_ttl, ttl / 2), expires=now + ttl)
+
+    def _store(self, key, result, previous=None):
+        entry = self._entry(result) if previous is None else dict(previous, stale_at=time.time() + self.backoff)
+        ttl = entry['expires'] - time.time()
+        if ttl > 0:
+            self.cache.set(key, entry, ttl=ttl)
+        return entry
+
+    def refresh(self, type, id):
+        if (type, id) in self._refreshing:
+            return
+        self._refreshing.add((type, id))
+        asyncio.ensure_future(self._refresh(type, id))
+
+    async def _refresh(self, type, id):
+        key = f"{type}:{id}"
+        try:
+            # Tempos e falhas da atualização não entram na requisição que a disparou, e as
+            # chamadas dela vão num fluxo próprio nas filas por host
+            metrics.start_request()
+            http_client.set_flow('refresh')
+            result = await self.fetch(type, id, refresh=True)
+            streams = result['streams']
+            previous = await in_thread(self.cache.get, key)
+            if previous is not None and previous['streams'] and (not streams or (result['failed'] and len(streams) < len(previous['streams']))):
+                self.stats["kept"] += 1
+                logging.warning(f"Atualização de {id} veio incompleta; mantendo a lista anterior")
+                await in_thread(self._store, key, result, previous)
+            else:
+                self.stats["refreshed"] += 1
+                await in_thread(self._store, key, result)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.warning(f"Falha ao atualizar {id}: {e}")
+            previous = await in_thread(self.cache.get, key)
+            if previous is not None:
+                await in_thread(self._store, key, previous, previous)
+        finally:
+            self._refreshing.discard((type, id))
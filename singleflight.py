@@ -0,0 +1,77 @@
+import asyncio
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplica chamadas simultâneas: enquanto uma chamada com a mesma chave está em andamento,
+    as outras esperam por ela e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+    def __call__(self, key_func=None):
+        """
+        Decorator: deduplica as chamadas da função pela chave key_func(*args, **kwargs)
+        (padrão: os próprios argumentos).
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = key_func(*args, **kwargs) if key_func else (args, tuple(sorted(kwargs.items())))
+                return self.do((func.__module__, func.__qualname__, key), func, *args, **kwargs)
+            return wrapper
+        return decorator
+
+
+class AsyncSingleFlight:
+    """
+    Versão para o event loop: requisições iguais em andamento no mesmo worker aguardam a mesma Task.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, coro_func, *args):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_func(*args))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # shield: se um cliente desconectar, a Task continua para os outros
+        return await asyncio.shield(task)
+
+
+flight = SingleFlight()
@@ -0,0 +1,84 @@
+import functools
+import os
+import re
+import time
+from urllib.parse import urlparse
+
+from cache import make_cache, memoize
+
+# TTL dos links resolvidos; hosts com links assinados/expiráveis usam um TTL menor
+STREAM_CACHE_TTL = float(os.environ.get("STREAM_CACHE_TTL", "1800"))
+SIGNED_STREAM_TTL = float(os.environ.get("SIGNED_STREAM_TTL", "300"))
+SIGNED_HOSTS = ('streamtape', 'tapecontent', 'mediafire', 'degoo')
+SIGNED_PARAMS = re.compile(r'[?&](token|expires?|e|sig|signature|st|hash|q)=', re.IGNORECASE)
+
+resolved_cache = make_cache('resolved', maxsize=int(os.environ.get("STREAM_CACHE_SIZE", "4096")), ttl=STREAM_CACHE_TTL)
+# Link direto -> {'keys': chaves do resolved_cache que o produziram, 'at': quando foi resolvido},
+# para invalidate() não varrer o cache e link_ttl() saber quanto resta do link
+resolved_links = make_cache('resolved_links', maxsize=int(os.environ.get("STREAM_CACHE_SIZE", "4096")), ttl=STREAM_CACHE_TTL)
+
+
+def stream_url_of(result):
+    """
+    Extrai o link direto do retorno de um resolver: (url, headers) ou {'url': ...}.
+    """
+    if isinstance(result, dict):
+        return result.get('url') or ''
+    if isinstance(result, (tuple, list)) and result:
+        return result[0] or ''
+    return ''
+
+
+def is_signed(result):
+    url = stream_url_of(result)
+    host = urlparse(url).hostname or ''
+    return any(signed in host for signed in SIGNED_HOSTS) or bool(SIGNED_PARAMS.search(url))
+
+
+def stream_ttl(result):
+    return SIGNED_STREAM_TTL if is_signed(result) else STREAM_CACHE_TTL
+
+
+def link_ttl(stream):
+    """
+    Segundos que ainda restam ao link, contando desde a primeira resolução dele; links que não
+    vieram de um resolver (ex.: do 'Json/') têm o TTL inteiro.
+    """
+    link = resolved_links.get(stream_url_of(stream))
+    ttl = stream_ttl(stream)
+    return max(ttl - (time.time() - link['at']), 0) if link else ttl
+
+
+def cached_resolver(name):
+    """
+    Decorator para resolvers que recebem a URL do player e devolvem o link direto.
+    Só links resolvidos com sucesso vão para o cache.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def resolve(*args):
+            result = func(*args)
+            url = stream_url_of(result)
+            if url:
+                # Mesma chave do memoize abaixo
+                key = name + ':' + ':'.join(str(arg) for arg in args)
+                link = resolved_links.get(url)
+                if link is None:
+                    resolved_links.set(url, {'keys': [key], 'at': time.time()}, ttl=stream_ttl(result))
+                elif key not in link['keys']:
+                    expires = link['at'] + stream_ttl(result)
+                    resolved_links.set(url, dict(link, keys=link['keys'] + [key]), ttl=max(expires - time.time(), 1))
+            return result
+        return memoize(resolved_cache, should_cache=lambda result: bool(stream_url_of(result)),
+                       ttl=stream_ttl, key_prefix=name + ':')(resolve)
+    return decorator
+
+
+def invalidate(url):
+    """
+    Remove do cache um link direto que está fora do ar (todas as resoluções que levaram a ele).
+    """
+    link = resolved_links.get(url)
+    for key in link['keys'] if link else []:
+        resolved_cache.delete(key)
+    resolved_links.delete(url)
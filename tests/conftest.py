@@ -0,0 +1,28 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture(scope="session")
+def redis_url():
+    """
+    Sobe o substituto do Redis (benchmarks/resp_server.py) numa thread e devolve a URL dele.
+    """
+    import resp_server
+
+    ready = threading.Event()
+    port = []
+
+    def run():
+        asyncio.run(resp_server.serve(0, ready=lambda p: (port.append(p), ready.set())))
+
+    threading.Thread(target=run, daemon=True).start()
+    assert ready.wait(5), "resp_server não subiu"
+    return f"redis://127.0.0.1:{port[0]}/0"
@@ -0,0 +1,133 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from cache import TTLCache, SQLiteCache, RedisCache, memoize
+
+_namespaces = itertools.count()
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def make(request, tmp_path):
+    """
+    Fábrica de caches do backend do parâmetro; cada cache criado tem um namespace próprio.
+    """
+    def factory(maxsize=1024, ttl=3600):
+        namespace = f"test{next(_namespaces)}"
+        if request.param == 'sqlite':
+            return SQLiteCache(str(tmp_path / "cache.db"), namespace, maxsize, ttl)
+        if request.param == 'redis':
+            return RedisCache(request.getfixturevalue('redis_url'), namespace, maxsize, ttl)
+        return TTLCache(maxsize, ttl)
+    return factory
+
+
+def test_get_set_delete(make):
+    cache = make()
+    assert cache.get('a') is None
+    assert cache.get('a', 'padrão') == 'padrão'
+    cache.set('a', {'streams': [{'url': 'https://x/1.mp4', 'name': 'Netcine ação'}]})
+    assert cache.get('a') == {'streams': [{'url': 'https://x/1.mp4', 'name': 'Netcine ação'}]}
+    cache.delete('a')
+    assert cache.get('a') is None
+
+
+def test_values_round_trip_through_json(make):
+    cache = make()
+    cache.set('resolved', ('https://x/1.mp4', {'Referer': 'https://x/'}))
+    assert cache.get('resolved') == ['https://x/1.mp4', {'Referer': 'https://x/'}]
+    value = cache.get('resolved')
+    value[1]['Referer'] = 'alterado'
+    assert cache.get('resolved')[1]['Referer'] == 'https://x/'
+
+
+def test_falsy_values_are_hits(make):
+    cache = make()
+    cache.set('vazio', [])
+    cache.set('zero', 0)
+    assert cache.get('vazio', 'faltando') == []
+    assert cache.get('zero', 'faltando') == 0
+
+
+def test_ttl_expires(make):
+    cache = make(ttl=60)
+    cache.set('curto', 1, ttl=0.05)
+    cache.set('longo', 2)
+    time.sleep(0.1)
+    assert cache.get('curto') is None
+    assert cache.get('longo') == 2
+    assert dict(cache.items()) == {'longo': 2}
+
+
+def test_evicts_least_recently_used(make):
+    cache = make(maxsize=3)
+    for key in 'abc':
+        cache.set(key, key)
+        time.sleep(0.002)
+    cache.get('a')
+    time.sleep(0.002)
+    cache.set('d', 'd')
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+
+
+def test_clear_and_len(make):
+    cache = make()
+    other = make()
+    for key in 'abc':
+        cache.set(key, key)
+    other.set('a', 'outro')
+    assert len(cache) == 3
+    cache.clear()
+    assert len(cache) == 0
+    assert other.get('a') == 'outro'
+
+
+def test_memory_cache_persists_to_path(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache(ttl=60, path=path)
+    cache.set('filme', {'streams': [{'name': 'GoFilmes', 'url': 'https://x/1.mp4'}]})
+    cache.set('expirado', 1, ttl=-1)
+    cache.save()
+    reloaded = TTLCache(ttl=60, path=path)
+    assert reloaded.get('filme') == {'streams': [{'name': 'GoFilmes', 'url': 'https://x/1.mp4'}]}
+    assert reloaded.get('expirado') is None
+
+
+def test_memoize_calls_once_and_skips_uncacheable(make):
+    cache = make()
+    calls = []
+
+    @memoize(cache, should_cache=lambda result: result[0])
+    def resolve(link):
+        calls.append(link)
+        return (f"{link}.mp4" if link != 'ruim' else '', {})
+
+    assert resolve('a') == ('a.mp4', {})
+    assert resolve('a') == ['a.mp4', {}]
+    resolve('ruim')
+    resolve('ruim')
+    assert calls == ['a', 'ruim', 'ruim']
+
+
+def test_memoize_deduplicates_concurrent_misses(make):
+    cache = make()
+    calls = []
+    started = threading.Event()
+
+    @memoize(cache)
+    def slow(key):
+        calls.append(key)
+        started.set()
+        time.sleep(0.1)
+        return key.upper()
+
+    threads = [threading.Thread(target=slow, args=('x',)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ['x']
+    assert slow('x') == 'X'
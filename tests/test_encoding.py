@@ -0,0 +1,53 @@
+import gzip
+
+from fastapi import Response
+from starlette.requests import Request
+
+import encoding
+from encoding import FastJSONResponse, respond
+from http_cache import etag
+
+
+def make_request(accept_encoding='gzip', if_none_match=None):
+    headers = [(b'accept-encoding', accept_encoding.encode())]
+    if if_none_match:
+        headers.append((b'if-none-match', if_none_match.encode()))
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers, 'query_string': b''})
+
+
+def big_body():
+    return {"streams": [{"name": "Netcine", "title": f"Episódio {n}", "url": f"https://x/{n}.mp4"} for n in range(100)]}
+
+
+def test_compressed_response_and_304_share_etag(monkeypatch):
+    monkeypatch.setattr(encoding, 'brotli', None)
+    first = respond(make_request(), FastJSONResponse(big_body()), 600, 300)
+    assert first.status_code == 200
+    assert first.headers['content-encoding'] == 'gzip'
+    assert first.headers['etag'].endswith('-gz"')
+    assert gzip.decompress(first.body) == FastJSONResponse(big_body()).body
+
+    second = respond(make_request(if_none_match=first.headers['etag']), FastJSONResponse(big_body()), 600, 300)
+    assert second.status_code == 304
+    assert second.headers['etag'] == first.headers['etag']
+    assert second.headers['vary'] == 'Accept-Encoding'
+    assert second.headers['cache-control'] == 'public, max-age=600, stale-while-revalidate=300'
+
+
+def test_identity_client_gets_base_etag(monkeypatch):
+    monkeypatch.setattr(encoding, 'brotli', None)
+    body = FastJSONResponse(big_body()).body
+    first = respond(make_request('identity'), FastJSONResponse(big_body()), 600)
+    assert 'content-encoding' not in first.headers
+    assert first.headers['etag'] == etag(body)
+    second = respond(make_request('identity', if_none_match=etag(body)), FastJSONResponse(big_body()), 600)
+    assert second.status_code == 304 and second.headers['etag'] == etag(body)
+
+
+def test_small_body_is_not_compressed():
+    body = b'{"streams":[]}'
+    tag = etag(body)
+    first = respond(make_request(), Response(body, media_type="application/json"), 60, tag=tag)
+    assert 'content-encoding' not in first.headers and first.headers['etag'] == tag
+    second = respond(make_request(if_none_match=tag), Response(body, media_type="application/json"), 60, tag=tag)
+    assert second.status_code == 304 and second.headers['etag'] == tag
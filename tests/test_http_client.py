@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from http_client import HostLimiter, QueueTimeout, parse_host_limits, HOST_RPS
+
+
+def test_parse_host_limits_skips_invalid_items():
+    limits = parse_host_limits('imdb.com=16, gofilmes.top=4:5,ruim,=3:1,x=a:1,')
+    assert limits == {'imdb.com': (16, HOST_RPS), 'gofilmes.top': (4, 5.0)}
+
+
+def test_limits_concurrency():
+    limiter = HostLimiter(2, 0)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        limiter.acquire('flow')
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        limiter.release()
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert limiter.active == 0 and limiter.waiting() == 0
+
+
+def test_waiters_alternate_between_flows():
+    limiter = HostLimiter(1, 0)
+    limiter.acquire('ocupado')
+    order = []
+    lock = threading.Lock()
+
+    def call(flow, index):
+        limiter.acquire(flow)
+        with lock:
+            order.append((flow, index))
+        limiter.release()
+
+    threads = []
+    for flow, count in (('temporada', 4), ('usuario', 2)):
+        for index in range(count):
+            thread = threading.Thread(target=call, args=(flow, index))
+            thread.start()
+            threads.append(thread)
+            while limiter.waiting() < len(threads):
+                time.sleep(0.001)
+    limiter.release()
+    for thread in threads:
+        thread.join()
+    assert order == [('temporada', 0), ('usuario', 0), ('temporada', 1), ('usuario', 1),
+                     ('temporada', 2), ('temporada', 3)]
+
+
+def test_queue_timeout_leaves_no_waiter():
+    limiter = HostLimiter(1, 0)
+    limiter.acquire('a')
+    with pytest.raises(QueueTimeout):
+        limiter.acquire('b', timeout=0.05)
+    assert limiter.waiting() == 0
+    limiter.release()
+    limiter.acquire('b', timeout=0.05)
+    limiter.release()
+    assert limiter.active == 0
+
+
+def test_rate_limit_paces_after_burst():
+    limiter = HostLimiter(10, 20)
+    start = time.monotonic()
+    for _ in range(30):
+        limiter.acquire('flow')
+        limiter.release()
+    elapsed = time.monotonic() - start
+    # rajada de 20 na hora; as 10 seguintes a 20 por segundo
+    assert 0.4 <= elapsed < 1.0
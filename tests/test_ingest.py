@@ -0,0 +1,29 @@
+import pytest
+
+from ingest import file_type, merge_title
+
+
+SERIES = {"id": "tt0121955", "type": "series", "streams": [
+    {"temporada": 1, "episodio": 1, "streams": [{"name": "Topflix - Player", "url": "https://x/1.m3u8"}]},
+]}
+
+
+def test_file_type_from_shape():
+    assert file_type(SERIES) == 'series'
+    assert file_type({"id": "tt1", "type": "tvSpecial", "streams": [{"name": "Topflix", "url": "https://x/1.mp4"}]}) == 'movie'
+    assert file_type({"id": "tt1", "streams": []}) is None
+    assert file_type(None) is None
+
+
+def test_movie_streams_never_merge_into_episode_file():
+    with pytest.raises(ValueError):
+        merge_title(SERIES, 'tt0121955', 'movie', {(None, None): [{"name": "GoFilmes", "url": "https://x/f.mp4"}]})
+
+
+def test_episodes_keep_hand_made_streams():
+    data = merge_title(dict(SERIES), 'tt0121955', 'series', {
+        (1, 1): [{"name": "Netcine - DUBLADO", "url": "https://x/n.mp4"}],
+        (1, 2): [{"name": "GoFilmes", "url": "https://x/g.mp4"}],
+    })
+    assert [(item['temporada'], item['episodio']) for item in data['streams']] == [(1, 1), (1, 2)]
+    assert [stream['name'] for stream in data['streams'][0]['streams']] == ["Topflix - Player", "Netcine - DUBLADO"]
@@ -0,0 +1,40 @@
+import asyncio
+
+from prefetch import Prefetcher
+from response_cache import StaleWhileRevalidate
+
+
+def make_fetch(calls):
+    async def fetch(type, id, refresh=False):
+        calls.append(id)
+        return {'streams': [{'url': f'https://x/{id}.mp4'}], 'failed': []}
+    return fetch
+
+
+def test_skips_episode_already_in_response_cache():
+    calls = []
+
+    async def main():
+        responses = StaleWhileRevalidate(make_fetch(calls), enabled=True)
+        prefetcher = Prefetcher(make_fetch(calls), lambda id: 'tt1:1:2', cached=responses.has, enabled=True, delay=0)
+        await responses.get('series', 'tt1:1:2')
+        await prefetcher._schedule('series', 'tt1:1:1')
+        return prefetcher.stats
+
+    stats = asyncio.run(main())
+    assert calls == ['tt1:1:2']
+    assert stats['cached'] == 1 and stats['scheduled'] == 0
+
+
+def test_prefetches_and_serves_next_episode():
+    calls = []
+
+    async def main():
+        responses = StaleWhileRevalidate(make_fetch([]), enabled=True)
+        prefetcher = Prefetcher(make_fetch(calls), lambda id: 'tt2:1:2', cached=responses.has, enabled=True, delay=0)
+        await prefetcher._schedule('series', 'tt2:1:1')
+        return await prefetcher.get('series', 'tt2:1:2')
+
+    result = asyncio.run(main())
+    assert calls == ['tt2:1:2']
+    assert result['streams'] == [{'url': 'https://x/tt2:1:2.mp4'}]
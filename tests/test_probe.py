@@ -0,0 +1,39 @@
+import socket
+import struct
+import threading
+
+import requests
+
+from probe import host_unreachable
+
+
+def connection_error(url):
+    try:
+        requests.get(url, timeout=2)
+    except requests.ConnectionError as e:
+        return e
+    raise AssertionError(f"{url} não falhou")
+
+
+def test_refused_connection_takes_host_down():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    port = server.getsockname()[1]
+    server.close()
+    assert host_unreachable(connection_error(f"http://127.0.0.1:{port}/x"))
+
+
+def test_reset_only_affects_the_link():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+
+    def reset():
+        client, _ = server.accept()
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        client.close()
+
+    threading.Thread(target=reset, daemon=True).start()
+    error = connection_error(f"http://127.0.0.1:{server.getsockname()[1]}/x")
+    server.close()
+    assert not host_unreachable(error)
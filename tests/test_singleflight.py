@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, AsyncSingleFlight
+
+
+def run_together(count, target):
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'streams': []}
+
+    results, errors = run_together(5, lambda: group.do('chave', work))
+    assert not errors
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    group = SingleFlight()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("falhou")
+
+    results, errors = run_together(3, lambda: group.do('chave', fail))
+    assert not results
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+    assert group.do('chave', lambda: 'de novo') == 'de novo'
+    assert len(calls) == 1
+
+
+def test_different_keys_run_separately():
+    group = SingleFlight()
+    calls = []
+
+    @group(lambda imdb, refresh=False: (imdb, refresh))
+    def show(imdb, refresh=False):
+        calls.append((imdb, refresh))
+        time.sleep(0.05)
+        return imdb
+
+    run_together(3, lambda: show('tt1'))
+    run_together(3, lambda: show('tt1', refresh=True))
+    show('tt2')
+    assert sorted(calls) == [('tt1', False), ('tt1', True), ('tt2', False)]
+
+
+def test_async_flight_shares_task():
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def fetch(id):
+        calls.append(id)
+        await asyncio.sleep(0.05)
+        return id
+
+    async def main():
+        return await asyncio.gather(*[group.do(('stream', 'tt1'), fetch, 'tt1') for _ in range(5)])
+
+    assert asyncio.run(main()) == ['tt1'] * 5
+    assert calls == ['tt1']
+
+
+def test_async_flight_survives_cancelled_waiter():
+    group = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return 'ok'
+
+    async def main():
+        first = asyncio.ensure_future(group.do('chave', fetch))
+        second = asyncio.ensure_future(group.do('chave', fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == 'ok'